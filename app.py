@@ -1,5 +1,11 @@
+import threading
+
 import streamlit as st
 
+from backend.config import JOB_WORKERS, WARM_UP
+from backend.lib.instrumentation import configure_logging
+from backend.warmup import warm_up
+from backend.worker import start_workers
 
 st.set_page_config(
     page_title="Loan statement reader",
@@ -12,6 +18,21 @@ st.set_page_config(
     },
 )
 
+
+@st.cache_resource
+def start_server():
+    """
+    Runs once per server process, on the first page load: starts the job workers
+    (which warm up on their own) and warms this process up in the background.
+    """
+    configure_logging()
+    if WARM_UP:
+        threading.Thread(target=warm_up, kwargs={"pipeline": False, "client": False}, daemon=True).start()
+    return start_workers(JOB_WORKERS) if JOB_WORKERS > 0 else []
+
+
+start_server()
+
 pages = {
     "Loan reader": [
         st.Page("frontend/home.py", title="Upload de fatura"),
@@ -0,0 +1,214 @@
+"""
+Headless batch processing: classify, split, extract and flatten a folder of statements.
+
+Usage:
+    python -m backend statements/ --output output/ --format parquet --workers 4
+    python -m backend "statements/2024-*.pdf" --split-only --output split/
+"""
+
+import argparse
+import glob
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+
+from backend.config import JOB_BATCH_FILES, LOG_LEVEL
+from backend.lib.export import write_tables
+from backend.lib.funcs import iter_split_pdf
+from backend.lib.instrumentation import configure_logging
+
+# Optional package each output format needs
+FORMAT_REQUIREMENTS = {"parquet": "pyarrow", "xlsx": "xlsxwriter"}
+
+
+def collect_inputs(inputs: List[str]) -> List[Path]:
+    """Expands directories (all PDFs inside, recursively) and glob patterns, sorted and unique."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(Path(item).rglob("*.pdf"))
+            paths.update(Path(item).rglob("*.PDF"))
+        else:
+            paths.update(Path(p) for p in glob.glob(item, recursive=True))
+    return sorted(p for p in paths if p.is_file())
+
+
+def _sha256_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def process_batch(paths: List[Path]) -> List[dict]:
+    """
+    Runs the full pipeline once on a batch of files, so they are processed
+    concurrently and a statement found in several of them is extracted once.
+    Executed inside a worker process.
+
+    Returns:
+        List[dict]: Per file, in order, its parts or the error that failed it.
+    """
+    # Imported here so the parent process never creates a Gemini client
+    from backend.lib.pipeline import process_documents
+
+    start = time.perf_counter()
+    documents = [(path.name, path.read_bytes()) for path in paths]
+    outcomes: List[dict] = [{} for _ in paths]
+
+    def on_file(id_file, parts):
+        path, data = paths[id_file], documents[id_file][1]
+        errors = [part["Erro"] for part in parts if "Erro" in part]
+        outcomes[id_file] = {"file": str(path)}
+        if errors:
+            outcomes[id_file]["error"] = "; ".join(errors)
+            return
+        outcomes[id_file].update(
+            sha256=hashlib.sha256(data).hexdigest(),
+            parts=parts,
+            seconds=time.perf_counter() - start,
+        )
+
+    process_documents(documents, on_file=on_file)
+    return outcomes
+
+
+def make_batches(
+    paths: List[Path], digests: Dict[Path, str], workers: int, batch_files: int
+) -> List[List[Path]]:
+    """
+    Splits files into at least `workers` batches of at most about `batch_files` files,
+    keeping files with the same content in one batch (they are extracted once there).
+    """
+    groups: Dict[str, List[Path]] = {}
+    for path in paths:
+        groups.setdefault(digests[path], []).append(path)
+    count = max(1, min(len(groups), max(workers, -(-len(paths) // max(batch_files, 1)))))
+    batches: List[List[Path]] = [[] for _ in range(count)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(batches, key=len).extend(group)
+    return [batch for batch in batches if batch]
+
+
+def split_file(path: Path, output_dir: Path) -> int:
+    """Writes each sub-document of a concatenated PDF as '<stem>_subdoc_<n>.pdf'."""
+    count = 0
+    for count, (sub_doc, (start_page, end_page)) in enumerate(
+        iter_split_pdf(path.read_bytes()), start=1
+    ):
+        output_filename = output_dir / f"{path.stem}_subdoc_{count}.pdf"
+        print(f"  Creating '{output_filename.name}' (Pages {start_page + 1} to {end_page})...")
+        output_filename.write_bytes(sub_doc.getvalue())
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m backend", description="Batch loan statement reader."
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("--output", default="output", help="Output directory")
+    parser.add_argument("--format", choices=["parquet", "csv", "xlsx"], default="parquet")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="Worker processes"
+    )
+    parser.add_argument(
+        "--batch-files", type=int, default=JOB_BATCH_FILES,
+        help="Files each worker runs through the pipeline together",
+    )
+    parser.add_argument(
+        "--split-only", action="store_true",
+        help="Only split concatenated PDFs into sub-documents (no LLM calls)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Reprocess files that already have results"
+    )
+    parser.add_argument(
+        "--log-level", default=LOG_LEVEL, help="Level of the loan_reader loggers (INFO logs every span)"
+    )
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level)
+
+    requirement = FORMAT_REQUIREMENTS.get(args.format)
+    if requirement and not args.split_only:
+        try:
+            importlib.import_module(requirement)
+        except ImportError:
+            print(f"Error: {args.format} output needs {requirement} "
+                  f"(pip install {requirement}), or use --format csv.")
+            return 1
+
+    paths = collect_inputs(args.inputs)
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if not paths:
+        print("Error: No PDF files found.")
+        return 1
+
+    if args.split_only:
+        for path in paths:
+            print(f"Processing '{path.name}'...")
+            split_file(path, output_dir)
+        return 0
+
+    extractions_dir = output_dir / "extractions"
+    extractions_dir.mkdir(exist_ok=True)
+
+    # Skip files whose content already has a stored extraction
+    done, pending, digests = {}, [], {}
+    for path in paths:
+        digests[path] = _sha256_file(path)
+        result_file = extractions_dir / f"{digests[path]}.json"
+        if result_file.exists() and not args.force:
+            done[path] = json.loads(result_file.read_text(encoding="utf-8"))
+        else:
+            pending.append(path)
+    print(f"{len(paths)} file(s) found, {len(done)} already done, {len(pending)} to process.")
+
+    start = time.perf_counter()
+    failed = 0
+    num_parts = 0
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=args.workers, initializer=configure_logging, initargs=(args.log_level,)
+        ) as executor:
+            batches = make_batches(pending, digests, args.workers, args.batch_files)
+            futures = {executor.submit(process_batch, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    outcomes = [{"file": str(path), "error": str(e)} for path in futures[future]]
+                for path, extraction in zip(futures[future], outcomes):
+                    if "error" in extraction:
+                        failed += 1
+                        print(f"Error: Failed to process '{path}': {extraction['error']}")
+                        continue
+                    result_file = extractions_dir / f"{extraction['sha256']}.json"
+                    result_file.write_text(
+                        json.dumps(extraction, ensure_ascii=False), encoding="utf-8"
+                    )
+                    done[path] = extraction
+                    num_parts += len(extraction["parts"])
+                    print(f"  Done '{path.name}': {len(extraction['parts'])} part(s) "
+                          f"in {extraction['seconds']:.1f}s")
+    elapsed = time.perf_counter() - start
+
+    processed = len(pending) - failed
+    if processed:
+        print(
+            f"Processed {processed} file(s) / {num_parts} part(s) in {elapsed:.1f}s "
+            f"({processed / elapsed * 60:.1f} files/min, {num_parts / elapsed * 60:.1f} parts/min)"
+        )
+    if failed:
+        print(f"Warning: {failed} file(s) failed and will be retried on the next run.")
+
+    results = {}
+    for path in paths:
+        if path in done:
+            results.setdefault(path.name, []).extend(done[path]["parts"])
+    for output_file in write_tables(results, output_dir, args.format):
+        print(f"Wrote '{output_file}'")
+    return 1 if failed else 0
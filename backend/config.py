@@ -0,0 +1,99 @@
+"""Deployment settings, read from environment variables with sensible defaults."""
+
+import os
+
+# Gemini model used for classification and extraction
+MODEL = os.environ.get("LOAN_READER_MODEL", "gemini-2.0-flash-lite")
+
+# Maximum number of classification/split/extraction tasks running at once
+MAX_WORKERS = int(os.environ.get("LOAN_READER_MAX_WORKERS", "8"))
+
+# Vertex AI project and region used by the Gemini client
+GCP_PROJECT = os.environ.get("LOAN_READER_GCP_PROJECT", "sap-tools-cdv")
+GCP_LOCATION = os.environ.get("LOAN_READER_GCP_LOCATION", "us-central1")
+
+# Persistent extraction cache. Set LOAN_READER_CACHE_DIR to an empty string to disable it.
+CACHE_DIR = os.environ.get(
+    "LOAN_READER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "loan-statement-reader"),
+)
+CACHE_MAX_MB = float(os.environ.get("LOAN_READER_CACHE_MAX_MB", "512"))
+CACHE_MAX_AGE_DAYS = float(os.environ.get("LOAN_READER_CACHE_MAX_AGE_DAYS", "90"))
+
+# Local classifier: pages read from each PDF and minimum confidence to skip the LLM
+HEURISTIC_CLASSIFIER_PAGES = int(os.environ.get("LOAN_READER_HEURISTIC_PAGES", "2"))
+HEURISTIC_CLASSIFIER_MIN_CONFIDENCE = float(
+    os.environ.get("LOAN_READER_HEURISTIC_MIN_CONFIDENCE", "0.75")
+)
+
+# Pages sent to the LLM classifier (the header is on the first page). 0 sends the whole PDF.
+CLASSIFIER_PAGES = int(os.environ.get("LOAN_READER_CLASSIFIER_PAGES", "1"))
+
+# If set, every instrumentation span is also appended to this file as a JSON line
+METRICS_FILE = os.environ.get("LOAN_READER_METRICS_FILE", "")
+
+# Level of the "loan_reader" loggers in the CLI, the job workers and the app; at INFO
+# every span record is logged as JSON (see backend/lib/instrumentation.py)
+LOG_LEVEL = os.environ.get("LOAN_READER_LOG_LEVEL", "WARNING").upper()
+
+# Vertex AI budgets (0 disables the budget), shared by every process of this machine
+# through a SQLite file (empty: each process gets the whole budget), lowest number of
+# calls the adaptive limiter keeps in flight while throttled, and retries per call on
+# 429/RESOURCE_EXHAUSTED or 5xx errors
+REQUESTS_PER_MINUTE = float(os.environ.get("LOAN_READER_REQUESTS_PER_MINUTE", "0"))
+TOKENS_PER_MINUTE = float(os.environ.get("LOAN_READER_TOKENS_PER_MINUTE", "0"))
+RATE_LIMIT_DB = os.environ.get(
+    "LOAN_READER_RATE_LIMIT_DB",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "loan-statement-reader", "rate_limit.sqlite3"),
+)
+RATE_LIMIT_MIN_CONCURRENCY = int(os.environ.get("LOAN_READER_MIN_CONCURRENCY", "1"))
+MAX_RETRIES = int(os.environ.get("LOAN_READER_MAX_RETRIES", "5"))
+
+# Documents longer than EXTRACTION_WINDOW_PAGES pages are extracted in windows of that
+# many pages, overlapping by EXTRACTION_WINDOW_OVERLAP pages, so a long statement does
+# not overflow the model's output limit. 0 always sends the whole document.
+EXTRACTION_WINDOW_PAGES = int(os.environ.get("LOAN_READER_WINDOW_PAGES", "6"))
+EXTRACTION_WINDOW_OVERLAP = int(os.environ.get("LOAN_READER_WINDOW_OVERLAP", "1"))
+
+# How documents are sent to the extractor: "pdf" (the file itself) or "text" (its
+# layout-preserving text layer, which is much smaller; pages with fewer than
+# TEXT_LAYER_MIN_CHARS characters of text, e.g. scans, are still sent as PDF). Set
+# per source with LOAN_READER_INPUT_MODE_<SOURCE>, e.g. LOAN_READER_INPUT_MODE_BNB=text
+INPUT_MODE = os.environ.get("LOAN_READER_INPUT_MODE", "pdf")
+INPUT_MODES = {
+    source: os.environ.get(f"LOAN_READER_INPUT_MODE_{source}", INPUT_MODE)
+    for source in ("BNB", "BNDES", "FDNE")
+}
+TEXT_LAYER_MIN_CHARS = int(os.environ.get("LOAN_READER_TEXT_MIN_CHARS", "20"))
+
+# Processes reading page numbers in parallel when splitting concatenated exports of at
+# least SPLIT_PARALLEL_MIN_PAGES pages, each on its own chunk of pages of a shared
+# temporary copy of the PDF. 1 reads them in the calling process, as before.
+SPLIT_WORKERS = int(os.environ.get("LOAN_READER_SPLIT_WORKERS", "1"))
+SPLIT_PARALLEL_MIN_PAGES = int(os.environ.get("LOAN_READER_SPLIT_PARALLEL_MIN_PAGES", "200"))
+
+# Durable job queue behind the web app (SQLite), number of worker processes the web
+# app starts (0: run them separately with `python -m backend.worker`), seconds without
+# a heartbeat before a running file is handed to another worker, runs allowed per
+# file before it is marked as failed, days finished jobs are kept, and files of a job
+# a worker claims at once to run them through the pipeline together (concurrently,
+# with identical statements extracted once)
+JOBS_DB = os.environ.get(
+    "LOAN_READER_JOBS_DB",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "loan-statement-reader", "jobs.sqlite3"),
+)
+JOB_WORKERS = int(os.environ.get("LOAN_READER_JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = float(os.environ.get("LOAN_READER_JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("LOAN_READER_JOB_MAX_ATTEMPTS", "3"))
+JOBS_MAX_AGE_DAYS = float(os.environ.get("LOAN_READER_JOBS_MAX_AGE_DAYS", "30"))
+JOB_BATCH_FILES = int(os.environ.get("LOAN_READER_JOB_BATCH_FILES", "50"))
+
+# Parse BNB statements from their text layer, calling the LLM only when the local
+# parser's output does not validate. Off until the parser has been compared with the
+# LLM on real exports (python -m benchmarks.bnb_parser)
+BNB_LOCAL_PARSER = os.environ.get("LOAN_READER_BNB_LOCAL_PARSER", "0") == "1"
+
+# Warm-up when the web server and the job workers start (see backend/warmup.py):
+# heavy modules are imported, flatteners compiled and, in the workers, the Gemini
+# client created, so the first request does not pay for them. "0" disables it.
+WARM_UP = os.environ.get("LOAN_READER_WARM_UP", "1") == "1"
@@ -1,24 +1,65 @@
 from google import genai
 from google.genai import types
-import base64
-import json
+import threading
+import time
 
+from backend.config import GCP_LOCATION, GCP_PROJECT, MAX_RETRIES
+from backend.lib.instrumentation import span
+from backend.lib.json_stream import JsonStreamParser
+from backend.lib.rate_limit import (
+    backoff_delay,
+    estimate_tokens,
+    get_limiter,
+    is_retryable,
+    is_throttled,
+)
+from backend.lib.text_layer import input_mode, payload_size
+
+# One client per process: it owns the credentials and the HTTP connection pool,
+# so every call (from any thread) reuses the same connections.
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(
+                    vertexai=True,
+                    project=GCP_PROJECT,
+                    location=GCP_LOCATION,
+                )
+    return _client
+
+
+def set_client(client):
+    """
+    Replaces the process-wide client, e.g. with a fake for offline tests.
+    Passing None drops the current client so the next call creates a real one.
+    """
+    global _client
+    with _client_lock:
+        _client = client
 
-def generate_response(model,prompt, output_schema, document):
-    client = genai.Client(
-        vertexai=True,
-        project="sap-tools-cdv",
-        location="us-central1",
-    )
 
+def _document_parts(document):
+    # A PDF, or a text-layer payload (see text_layer.py): text parts and PDF parts
+    if isinstance(document, bytes):
+        document = [document]
+    return [
+        types.Part.from_text(text=part) if isinstance(part, str)
+        else types.Part.from_bytes(data=part, mime_type="application/pdf")
+        for part in document
+    ]
+
+
+def _build_request(prompt, output_schema, document):
     text1 = types.Part.from_text(text=prompt)
-    document1 = types.Part.from_bytes(
-        data=document,
-        mime_type="application/pdf",
-    )
 
-    model = model
-    contents = [types.Content(role="user", parts=[text1, document1])]
+    contents = [types.Content(role="user", parts=[text1, *_document_parts(document)])]
     generate_content_config = types.GenerateContentConfig(
         temperature=0,
         top_p=0.95,
@@ -27,12 +68,87 @@ def generate_response(model,prompt, output_schema, document):
         response_mime_type="application/json",
         response_schema=output_schema,
     )
+    return contents, generate_content_config
+
+
+def _record_usage(llm_span, chunk):
+    # Token counts arrive on the stream's chunks; the last one holds the totals
+    usage = getattr(chunk, "usage_metadata", None)
+    if usage is not None:
+        llm_span.set(
+            input_tokens=usage.prompt_token_count or 0,
+            output_tokens=usage.candidates_token_count or 0,
+        )
+
+
+def _should_retry(error, received, attempt, llm_span):
+    # Once chunks were handed to the caller the call cannot be replayed transparently
+    if error is None or received or attempt >= MAX_RETRIES or not is_retryable(error):
+        return False
+    llm_span.add(retries=1)
+    if is_throttled(error):
+        llm_span.add(throttled=1)
+    return True
+
+
+def _token_correction(llm_span, estimated_tokens):
+    actual = llm_span.attributes.get("input_tokens")
+    return actual - estimated_tokens if actual else 0
+
+
+def _iter_chunks(model, contents, config, estimated_tokens, llm_span):
+    """
+    Yields the response chunks of one call through the process-wide rate limiter.
+
+    Quota (429 / RESOURCE_EXHAUSTED) and transient 5xx errors raised before the first
+    chunk arrives are retried up to MAX_RETRIES times with jittered exponential backoff.
+    """
+    client = get_client()
+    limiter = get_limiter()
+    attempt = 0
+    while True:
+        ticket = limiter.acquire(estimated_tokens)
+        error, received = None, False
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=config,
+            ):
+                received = True
+                _record_usage(llm_span, chunk)
+                yield chunk
+        except Exception as e:
+            error = e
+        finally:
+            limiter.release(
+                ticket,
+                throttled=error is not None and is_throttled(error),
+                token_correction=_token_correction(llm_span, estimated_tokens),
+            )
+        if error is None:
+            return
+        if not _should_retry(error, received, attempt, llm_span):
+            raise error
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
+
+
+def generate_response(model, prompt, output_schema, document):
+    """
+    Streams the model's JSON answer and returns it parsed. The answer is decoded
+    as it arrives (see JsonStreamParser), so nothing is left to parse once the
+    last chunk is in.
+
+    document is the PDF bytes, or a text-layer payload from text_layer.text_payload.
+    """
+    contents, generate_content_config = _build_request(prompt, output_schema, document)
+    estimated = estimate_tokens(prompt, document)
 
-    response = ""
-    for chunk in client.models.generate_content_stream(
-        model=model,
-        contents=contents,
-        config=generate_content_config,
-    ):
-        response += chunk.text
-    return json.loads(response)
+    parser = JsonStreamParser()
+    with span(
+        "llm_call", model=model, input_mode=input_mode(document), bytes_sent=payload_size(document)
+    ) as llm_span:
+        for chunk in _iter_chunks(model, contents, generate_content_config, estimated, llm_span):
+            parser.feed(chunk.text or "")
+        return parser.close()
@@ -0,0 +1,378 @@
+"""
+Local parser for BNB statements, reading the PDF text layer instead of calling the LLM.
+
+BNB statements are generated PDFs with a real text layer. Each page is extracted
+with pypdf's layout mode, which keeps the columns of the transaction table aligned,
+so the amounts of a row can be assigned to the 'Valor'/'Saldo' columns of the table
+heading by their position even when some columns are empty.
+
+The result has the shape of BNB_SCHEMA and keeps values as printed. It is checked
+before being used (see validate_statement): anything the parser is not sure about
+raises BnbParseError, and the caller falls back to the LLM.
+"""
+
+import io
+import re
+import unicodedata
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import pypdf
+
+DATE = r"\d{2}/\d{2}/\d{4}"
+AMOUNT = r"-?\d{1,3}(?:\.\d{3})*,\d{2}-?"
+AMOUNT_PATTERN = re.compile(AMOUNT)
+ROW_PATTERN = re.compile(
+    rf"^\s*(?P<lancamento>{DATE})\s+(?P<valorizacao>{DATE})\s+(?P<dc>[DC])\s+"
+    rf"(?P<historico>.*?)\s+(?P<amounts>{AMOUNT}(?:\s+{AMOUNT})*)\s*$"
+)
+DATED_LINE_PATTERN = re.compile(rf"^\s*{DATE}\s+{DATE}\b")
+PAGE_PATTERN = re.compile(r"P[áa]g(?:ina)?\.?\s*(\d+)\s*de\s*(\d+)", re.IGNORECASE)
+DATETIME_PATTERN = re.compile(rf"({DATE})\s+(\d{{2}}:\d{{2}}(?::\d{{2}})?)")
+PERIOD_PATTERN = re.compile(
+    rf"per[íi]odo\s*:?\s*(?:de\s+)?({DATE})\s*(?:a|at[ée]|-)\s*({DATE})", re.IGNORECASE
+)
+BANK_PATTERN = re.compile(r"banco\s+do\s+nordeste(?:\s+do\s+brasil)?(?:\s+s\.?\s*a\.?)?", re.IGNORECASE)
+TITLE_PATTERN = re.compile(r"extrato\b.*?(?=\s{2,}|$)", re.IGNORECASE)
+COLUMN_PATTERN = re.compile(
+    r"\b(valor|saldo)\b(?:\s+(normal|atraso|preju[íi]zo))?", re.IGNORECASE
+)
+GROUP_PATTERN = re.compile(r"\b(normal|atraso|preju[íi]zo)\b", re.IGNORECASE)
+
+# Header labels: (path in the result, label pattern). A value runs until two spaces
+# (the next field in layout text) or the end of the line.
+LABELS = [
+    (("agencia",), r"ag[êe]ncia"),
+    (("info_cliente", "nome"), r"(?:nome\s+do\s+)?cliente|nome"),
+    (("info_cliente", "endereço"), r"endere[çc]o"),
+    (("dados_operacao", "area_de_credito"), r"[áa]rea\s+de\s+cr[ée]dito"),
+    (("dados_operacao", "codigo_da_operacao"), r"c[óo]d(?:igo|\.)\s+da\s+opera[çc][ãa]o"),
+    (("dados_operacao", "valor_da_operacao"), r"valor\s+da\s+opera[çc][ãa]o"),
+    (("dados_operacao", "data_do_contrato"), r"data\s+do\s+contrato"),
+    (("dados_operacao", "vencimento_final"), r"vencimento\s+final"),
+    (("dados_operacao", "moeda_da_operacao"), r"moeda\s+da\s+opera[çc][ãa]o"),
+    (("dados_operacao", "moeda_indexadora"), r"moeda\s+indexadora"),
+    (("dados_operacao", "programa"), r"programa"),
+]
+LABEL_PATTERNS = [
+    (path, re.compile(rf"(?:^|\s)(?:{label})\s*:\s*(.+?)(?=\s{{2,}}|$)", re.IGNORECASE | re.MULTILINE))
+    for path, label in LABELS
+]
+
+# Lines holding balances/totals, matched on accent-free lower-case text
+SUMMARY_LINES = {
+    "saldo_inicial": re.compile(r"^\s*saldo\s+(?:inicial|anterior)\b"),
+    "principal": re.compile(r"^\s*principal\b"),
+    "jus_bas_var": re.compile(r"^\s*jus\s*/\s*bas\s*/\s*var\b"),
+    "total_cliente_operacao": re.compile(r"^\s*total\s+(?:do\s+)?cliente\s*/\s*opera"),
+    "total_cliente_ficha": re.compile(r"^\s*total\s+(?:do\s+)?cliente\s*/\s*ficha"),
+    "total_geral_pago": re.compile(r"^\s*total\s+geral\s+pago\b"),
+}
+
+ROW_FIELDS = [
+    "valor_normal", "saldo_normal", "valor_atraso",
+    "saldo_atraso", "valor_prejuizo", "saldo_prejuizo",
+]
+
+
+class BnbParseError(ValueError):
+    """The statement could not be parsed with enough certainty; use the LLM instead."""
+
+
+def _plain(text: str) -> str:
+    # Lower-case, accent-free copy with the same character offsets
+    return "".join(
+        unicodedata.normalize("NFKD", ch)[0] for ch in text
+    ).lower()
+
+
+def _clean(value: str) -> str:
+    return " ".join(value.split())
+
+
+def _to_decimal(amount: Optional[str]) -> Optional[Decimal]:
+    if not amount:
+        return None
+    negative = amount.startswith("-") or amount.endswith("-")
+    value = Decimal(amount.strip("-").replace(".", "").replace(",", "."))
+    return -value if negative else value
+
+
+def page_texts(pdf_bytes: bytes) -> List[str]:
+    """Layout-mode text of every page."""
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    return [page.extract_text(extraction_mode="layout") or "" for page in reader.pages]
+
+
+def _columns(line: str, previous: str) -> List[Tuple[str, int, int]]:
+    """
+    Amount columns of a table heading line as (field, start, end), from the
+    'Valor'/'Saldo' headings after 'Histórico'. Columns are named by the word after
+    the heading or, failing that, by the nearest of 'Normal', 'Atraso' and 'Prejuízo'
+    on the line above; if that does not give distinct names, by their order.
+    """
+    plain = _plain(line)
+    groups = [
+        (match.group(1), (match.start() + match.end()) / 2)
+        for match in GROUP_PATTERN.finditer(_plain(previous))
+    ]
+    matches = list(COLUMN_PATTERN.finditer(plain, plain.find("hist")))
+    names = []
+    for match in matches:
+        group = match.group(2)
+        if group is None and len(groups) >= 2:
+            center = (match.start() + match.end()) / 2
+            group = min(groups, key=lambda g: abs(g[1] - center))[0]
+        names.append(f"{match.group(1)}_{group}")
+    if len(set(names)) < len(names) or any(name.endswith("_None") for name in names):
+        counts = {"valor": 0, "saldo": 0}
+        names = []
+        for match in matches:
+            kind = match.group(1)
+            names.append(f"{kind}_{['normal', 'atraso', 'prejuizo'][min(counts[kind], 2)]}")
+            counts[kind] += 1
+    return [(name, match.start(), match.end()) for name, match in zip(names, matches)]
+
+
+def _is_heading(line: str) -> bool:
+    plain = _plain(line)
+    return "hist" in plain and "saldo" in plain and not DATED_LINE_PATTERN.match(line)
+
+
+def _assign(line: str, start: int, columns: List[Tuple[str, int, int]]) -> Dict[str, str]:
+    """Assigns each amount found in line[start:] to the heading column it sits under."""
+    values: Dict[str, str] = {}
+    last_index = -1
+    for match in AMOUNT_PATTERN.finditer(line, start):
+        def distance(column):
+            _, col_start, col_end = column
+            gap = max(col_start - match.end(), match.start() - col_end, 0)
+            center = abs((col_start + col_end) / 2 - (match.start() + match.end()) / 2)
+            return gap, center
+
+        index = min(range(len(columns)), key=lambda i: distance(columns[i]))
+        field = columns[index][0]
+        if field in values or index <= last_index:
+            raise BnbParseError(f"Valores fora das colunas: {_clean(line)!r}")
+        values[field] = match.group(0)
+        last_index = index
+    return values
+
+
+def _summary_values(line: str, columns, saldo_only: bool) -> Dict[str, str]:
+    # Balance/total lines: amounts go by column when a heading was seen, else in order
+    if columns:
+        return _assign(line, 0, columns)
+    amounts = AMOUNT_PATTERN.findall(line)
+    names = [f for f in ROW_FIELDS if f.startswith("saldo")] if saldo_only else ROW_FIELDS
+    if len(amounts) > len(names):
+        raise BnbParseError(f"Linha de saldo não reconhecida: {_clean(line)!r}")
+    return dict(zip(names, amounts))
+
+
+def parse_statement_text(pages: List[str]) -> dict:
+    """
+    Builds a BNB_SCHEMA-shaped extraction from the layout text of one statement's pages.
+    Raises BnbParseError on lines that look like transactions but do not parse.
+    """
+    text = "\n".join(pages)
+    first = pages[0] if pages else ""
+    result = {
+        "nome_banco": None,
+        "titulo_documento": None,
+        "agencia": None,
+        "page_info": {"current_page": None, "total_pages": None},
+        "report_datetime": {"data": None, "hora": None},
+        "info_cliente": {"nome": None, "endereço": None},
+        "dados_operacao": {
+            "periodo": {"data_inicio": None, "data_fim": None},
+            "area_de_credito": None,
+            "codigo_da_operacao": None,
+            "valor_da_operacao": None,
+            "data_do_contrato": None,
+            "vencimento_final": None,
+            "moeda_da_operacao": None,
+            "moeda_indexadora": None,
+            "programa": None,
+        },
+        "saldo_inicial": {"saldo_normal": None, "saldo_atraso": None, "saldo_prejuizo": None},
+        "transacoes": [],
+        "saldo_final": {"principal": None, "jus_bas_var": None},
+        "totais": {
+            "total_cliente_operacao": None,
+            "total_cliente_ficha": None,
+            "total_geral_pago": None,
+        },
+        "banco_emissor": None,
+    }
+
+    banks = [_clean(match.group(0)) for match in BANK_PATTERN.finditer(text)]
+    if banks:
+        result["nome_banco"] = banks[0]
+        result["banco_emissor"] = banks[-1]
+    title = TITLE_PATTERN.search(first)
+    if title:
+        result["titulo_documento"] = _clean(title.group(0))
+    page = PAGE_PATTERN.search(first)
+    if page:
+        result["page_info"] = {"current_page": page.group(1), "total_pages": page.group(2)}
+    stamp = DATETIME_PATTERN.search(first)
+    if stamp:
+        result["report_datetime"] = {"data": stamp.group(1), "hora": stamp.group(2)}
+    period = PERIOD_PATTERN.search(text)
+    if period:
+        result["dados_operacao"]["periodo"] = {
+            "data_inicio": period.group(1), "data_fim": period.group(2),
+        }
+    for path, pattern in LABEL_PATTERNS:
+        match = pattern.search(first)
+        if match:
+            target = result
+            for key in path[:-1]:
+                target = target[key]
+            if target[path[-1]] is None:
+                target[path[-1]] = _clean(match.group(1))
+
+    columns: List[Tuple[str, int, int]] = []
+    for page_text in pages:
+        previous = ""
+        for line in page_text.splitlines():
+            if _is_heading(line):
+                columns = _columns(line, previous)
+            elif DATED_LINE_PATTERN.match(line):
+                row = ROW_PATTERN.match(line)
+                if row is None or not columns:
+                    raise BnbParseError(f"Lançamento não reconhecido: {_clean(line)!r}")
+                values = _assign(line, row.start("amounts"), columns)
+                result["transacoes"].append({
+                    "data_lancamento": row.group("lancamento"),
+                    "data_valorizacao": row.group("valorizacao"),
+                    "d/c": row.group("dc"),
+                    "historico": _clean(row.group("historico")),
+                    **{field: values.get(field) for field in ROW_FIELDS},
+                })
+            else:
+                plain = _plain(line)
+                for name, pattern in SUMMARY_LINES.items():
+                    if not pattern.match(plain):
+                        continue
+                    if name == "total_geral_pago":
+                        amounts = AMOUNT_PATTERN.findall(line)
+                        result["totais"][name] = amounts[-1] if amounts else None
+                    elif name == "saldo_inicial":
+                        values = _summary_values(line, columns, saldo_only=True)
+                        result["saldo_inicial"] = {
+                            key: values.get(key) for key in result["saldo_inicial"]
+                        }
+                    elif name in ("principal", "jus_bas_var"):
+                        values = _summary_values(line, columns, saldo_only=False)
+                        result["saldo_final"][name] = {field: values.get(field) for field in ROW_FIELDS}
+                    else:
+                        values = _summary_values(line, columns, saldo_only=False)
+                        result["totais"][name] = {
+                            key: values.get(key)
+                            for key in ("valor_normal", "valor_atraso", "valor_prejuizo")
+                        }
+                    break
+            if line.strip():
+                previous = line
+    return result
+
+
+# Header fields that hold a date or an amount when present, and the operation code
+HEADER_FORMATS = [
+    (("dados_operacao", "periodo", "data_inicio"), re.compile(DATE)),
+    (("dados_operacao", "periodo", "data_fim"), re.compile(DATE)),
+    (("dados_operacao", "data_do_contrato"), re.compile(DATE)),
+    (("dados_operacao", "vencimento_final"), re.compile(DATE)),
+    (("dados_operacao", "valor_da_operacao"), AMOUNT_PATTERN),
+    (("dados_operacao", "codigo_da_operacao"), re.compile(r"\d[\d./-]*")),
+]
+# A value holding "Label:" ran into the next field of the line
+SWALLOWED_LABEL_PATTERN = re.compile(r"\w{3,}\s*:(?:\s|$)")
+
+
+def _field(result: dict, path: Tuple[str, ...]):
+    for key in path:
+        result = result[key]
+    return result
+
+
+def validate_header(result: dict) -> None:
+    """
+    Raises BnbParseError unless the header fields look right: bank, client name and
+    operation code found, dates, amount and code in their formats, and no value
+    running into the label of the next field.
+    """
+    if not result["nome_banco"]:
+        raise BnbParseError("Nome do banco não encontrado")
+    if not result["dados_operacao"]["codigo_da_operacao"]:
+        raise BnbParseError("Código da operação não encontrado")
+    if not result["info_cliente"]["nome"]:
+        raise BnbParseError("Nome do cliente não encontrado")
+    for path, pattern in HEADER_FORMATS:
+        value = _field(result, path)
+        if value is not None and not pattern.fullmatch(value):
+            raise BnbParseError(f"Valor inesperado em {'.'.join(path)}: {value!r}")
+    for path, _ in LABELS:
+        value = _field(result, path)
+        if value is not None and SWALLOWED_LABEL_PATTERN.search(value):
+            raise BnbParseError(f"Valor inesperado em {'.'.join(path)}: {value!r}")
+
+
+def validate_statement(result: dict) -> None:
+    """
+    Raises BnbParseError unless the extraction is complete and self-consistent:
+    header fields valid (see validate_header), at least one transaction, every
+    required row field present, and the normal balance of each row equal to the
+    previous balance plus or minus its amount (with one debit/credit sign
+    convention for all rows).
+    """
+    validate_header(result)
+    rows = result["transacoes"]
+    if not rows:
+        raise BnbParseError("Nenhum lançamento encontrado")
+    for row in rows:
+        missing = [
+            field for field in ("d/c", "historico", "valor_normal", "saldo_normal")
+            if not row[field]
+        ]
+        if missing:
+            raise BnbParseError(f"Lançamento de {row['data_lancamento']} sem {', '.join(missing)}")
+
+    conventions = {1, -1}  # Sign applied to debits; credits get the opposite one
+    balance = _to_decimal(result["saldo_inicial"]["saldo_normal"])
+    for row in rows:
+        amount = _to_decimal(row["valor_normal"])
+        saldo = _to_decimal(row["saldo_normal"])
+        if balance is not None:
+            signed = amount if row["d/c"] == "D" else -amount
+            conventions = {
+                sign for sign in conventions if abs(balance + sign * signed - saldo) < Decimal("0.01")
+            }
+            if not conventions:
+                raise BnbParseError(
+                    f"Saldo normal de {row['data_lancamento']} não confere com o lançamento"
+                )
+        balance = saldo
+
+    principal = result["saldo_final"]["principal"] or {}
+    final = _to_decimal(principal.get("saldo_normal"))
+    if final is not None and final != balance:
+        raise BnbParseError("Saldo final não confere com o último lançamento")
+
+
+def parse_bnb_statement(pdf_bytes: bytes) -> dict:
+    """
+    Parses one BNB statement (a split part) from its text layer and validates it.
+    Raises BnbParseError when the result cannot be trusted.
+    """
+    try:
+        pages = page_texts(pdf_bytes)
+    except Exception as e:
+        raise BnbParseError(f"PDF ilegível: {e}") from e
+    if not any(page.strip() for page in pages):
+        raise BnbParseError("PDF sem camada de texto")
+    result = parse_statement_text(pages)
+    validate_statement(result)
+    return result
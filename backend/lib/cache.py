@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from backend.config import CACHE_DIR, CACHE_MAX_AGE_DAYS, CACHE_MAX_MB
+from backend.lib.funcs import document_fingerprint
+from backend.lib.instrumentation import current_span
+from backend.lib.text_layer import text_payload
+
+# Eviction runs when the cache is opened and then once every this many writes
+EVICT_EVERY = 50
+
+_refreshing: ContextVar[bool] = ContextVar("loan_reader_cache_refresh", default=False)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(
+    model: str, prompt: str, output_schema: dict, document: bytes, input_mode: str = "pdf"
+) -> str:
+    """
+    Content-addressed key for one generate_response call.
+
+    Combines the page fingerprint of the PDF (see funcs.document_fingerprint, so a
+    statement cut out of a concatenated export hits the entry of the same statement
+    uploaded on its own) with the model name, the prompt text and a hash of the
+    schema, so editing a prompt or a SCHEMAS entry invalidates old entries. Answers
+    to the text-layer payload of a PDF are keyed apart from answers to the PDF itself.
+    """
+    schema_hash = _sha256(
+        json.dumps(output_schema, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    )
+    key = hashlib.sha256()
+    parts = [document_fingerprint(document), model, _sha256(prompt.encode("utf-8")), schema_hash]
+    if input_mode != "pdf":
+        parts.append(input_mode)
+    for part in parts:
+        key.update(part.encode("utf-8"))
+        key.update(b"\0")
+    return key.hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite-backed store of generate_response results.
+
+    Entries older than max_age_days are dropped, and when the stored payloads exceed
+    max_mb the least recently used entries are evicted first. Safe to share between
+    threads; several processes may also point at the same directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_mb: Optional[float] = CACHE_MAX_MB,
+        max_age_days: Optional[float] = CACHE_MAX_AGE_DAYS,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "extractions.sqlite3")
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+        self.evict()
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.max_age and row[1] < now - self.max_age):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._writes += 1
+            evict_now = self._writes % EVICT_EVERY == 0
+        if evict_now:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drops expired entries, then least recently used ones until under max size.
+        Returns the number of entries removed."""
+        removed = 0
+        with self._lock, self._conn:
+            if self.max_age:
+                removed += self._conn.execute(
+                    "DELETE FROM entries WHERE created_at < ?",
+                    (time.time() - self.max_age,),
+                ).rowcount
+            if self.max_bytes:
+                total = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()[0]
+                if total > self.max_bytes:
+                    rows = self._conn.execute(
+                        "SELECT key, size FROM entries ORDER BY accessed_at"
+                    ).fetchall()
+                    stale = []
+                    for key, size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        stale.append((key,))
+                        total -= size
+                    self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+                    removed += len(stale)
+        return removed
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ExtractionCache]:
+    """Returns the process-wide cache, or None when CACHE_DIR is empty (cache disabled)."""
+    global _cache
+    if _cache is None and CACHE_DIR:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExtractionCache(CACHE_DIR)
+    return _cache
+
+
+@contextmanager
+def refreshing_cache():
+    """
+    Within this block (and the pipeline tasks started in it, which copy the
+    context), cached_generate_response does not reuse stored answers: every call
+    goes to the model and its answer replaces the stored one. Used to reprocess files.
+    """
+    token = _refreshing.set(True)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+
+def cached_generate_response(model, prompt, output_schema, document, input_mode="pdf"):
+    """
+    generate_response with the persistent cache in front of it.
+
+    With input_mode "text" the model gets the document's text layer instead of the
+    PDF (see text_layer.text_payload), read only when the answer is not cached.
+    """
+    def generate():
+        # Imported on the first call: sources parsed locally never load the Gemini SDK
+        from backend.connectors.gemini_connector import generate_response
+
+        payload = text_payload(document) if input_mode == "text" else document
+        return generate_response(model, prompt, output_schema, payload)
+
+    cache = get_cache()
+    if cache is None:
+        return generate()
+
+    key = cache_key(model, prompt, output_schema, document, input_mode)
+    cached = None if _refreshing.get() else cache.get(key)
+    stage_span = current_span()
+    if stage_span is not None:
+        stage_span.set(cache_hit=cached is not None)
+    if cached is not None:
+        return cached
+
+    prediction = generate()
+    cache.set(key, prediction)
+    return prediction
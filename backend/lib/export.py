@@ -0,0 +1,181 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from backend.lib.flatten import get_flattener
+from backend.lib.instrumentation import span
+
+# Columns added after the extracted fields on every exported row
+EXTRA_COLUMNS = ["Arquivo", "Parte"]
+
+EXPORT_FORMATS = {
+    "xlsx": ("extracted_data.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("extracted_data_csv.zip", "application/zip"),
+    "parquet": ("extracted_data_parquet.zip", "application/zip"),
+}
+
+
+def export_columns(source: str) -> List[str]:
+    return get_flattener(source).columns + EXTRA_COLUMNS
+
+
+def _cell(value):
+    # Lists/objects that were not expanded into rows are exported as JSON text
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def iter_part_rows(results: Dict[str, List[dict]]) -> Iterator[Tuple[str, Iterator[list]]]:
+    """
+    Yields (source, rows) for each successfully extracted part, where rows is an
+    iterator over that part's flattened rows in export_columns(source) order.
+
+    Only one part is flattened at a time, so memory stays bounded by the largest
+    part instead of the whole batch.
+    """
+    for file_name, parts in results.items():
+        for part in parts:
+            if part.get("Conteúdo") is None:
+                continue
+            source = part["Fonte"]
+            columns: Dict[str, list] = {}
+            count = get_flattener(source).flatten_into(
+                part["Conteúdo"],
+                columns,
+                extra={"Arquivo": file_name, "Parte": part.get("Parte")},
+            )
+            ordered = [columns[name] for name in export_columns(source)]
+            yield source, ([_cell(column[i]) for column in ordered] for i in range(count))
+
+
+def write_xlsx(results: Dict[str, List[dict]], output) -> None:
+    """Writes one sheet per source, row by row, in xlsxwriter's constant-memory mode."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    sheets = {}
+    for source, rows in iter_part_rows(results):
+        if source not in sheets:
+            worksheet = workbook.add_worksheet(source)
+            worksheet.write_row(0, 0, export_columns(source))
+            sheets[source] = [worksheet, 1]
+        sheet = sheets[source]
+        for row in rows:
+            sheet[0].write_row(sheet[1], 0, row)
+            sheet[1] += 1
+    if not sheets:
+        workbook.add_worksheet()
+    workbook.close()
+
+
+def write_csv(results: Dict[str, List[dict]], directory: Path) -> List[Path]:
+    """Writes '<source>.csv' files into directory, streaming rows as they are flattened."""
+    handles, writers = {}, {}
+    try:
+        for source, rows in iter_part_rows(results):
+            if source not in writers:
+                handles[source] = open(
+                    directory / f"{source}.csv", "w", newline="", encoding="utf-8-sig"
+                )
+                writers[source] = csv.writer(handles[source])
+                writers[source].writerow(export_columns(source))
+            writers[source].writerows(rows)
+    finally:
+        for handle in handles.values():
+            handle.close()
+    return [directory / f"{source}.csv" for source in handles]
+
+
+def parquet_schema(source: str):
+    """
+    Arrow schema of a source's Parquet export: FIELD_TYPES amounts as int64 cents,
+    dates as date32, categories dictionary-encoded and everything else as strings.
+    """
+    import pyarrow as pa
+
+    from backend.lib.field_types import column_types
+
+    arrow_types = {
+        "amount": pa.int64(),
+        "date": pa.date32(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+    }
+    names = export_columns(source)
+    types = column_types(source, names)
+    return pa.schema(
+        [(name, arrow_types[types[name]] if name in types else pa.string()) for name in names]
+    )
+
+
+def write_parquet(results: Dict[str, List[dict]], directory: Path) -> List[Path]:
+    """
+    Writes '<source>.parquet' files into directory, one row group per part, so only
+    one part is held in memory at a time. Columns are typed (see parquet_schema).
+    Needs pyarrow.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from backend.lib.field_types import column_types, typed_frame
+
+    writers = {}
+    try:
+        for source, rows in iter_part_rows(results):
+            names = export_columns(source)
+            if source not in writers:
+                writers[source] = pq.ParquetWriter(
+                    directory / f"{source}.parquet", parquet_schema(source)
+                )
+            schema = writers[source].schema
+            types = column_types(source, names)
+            frame = pd.DataFrame(list(rows), columns=names, dtype=object)
+            for name in names:
+                if name not in types:
+                    frame[name] = [None if v is None else str(v) for v in frame[name]]
+            writers[source].write_table(
+                pa.Table.from_pandas(typed_frame(frame, source), schema=schema, preserve_index=False)
+            )
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return [directory / f"{source}.parquet" for source in writers]
+
+
+def write_tables(results: Dict[str, List[dict]], directory: Path, fmt: str) -> List[Path]:
+    """Writes one '<source>.<fmt>' file per source ('xlsx' writes a single workbook)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    if fmt == "xlsx":
+        path = directory / EXPORT_FORMATS["xlsx"][0]
+        write_xlsx(results, str(path))
+        return [path]
+    if fmt == "csv":
+        return write_csv(results, directory)
+    if fmt == "parquet":
+        return write_parquet(results, directory)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_results(results: Dict[str, List[dict]], fmt: str) -> bytes:
+    """
+    Builds the download for the results page: an xlsx workbook, or a zip with one
+    CSV/Parquet file per source. Intermediate files live in a temporary directory.
+    """
+    with span("export", format=fmt) as export_span, tempfile.TemporaryDirectory() as tmp:
+        paths = write_tables(results, Path(tmp), fmt)
+        if fmt == "xlsx":
+            data = paths[0].read_bytes()
+        else:
+            output = io.BytesIO()
+            with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+                for path in paths:
+                    archive.write(path, os.path.basename(path))
+            data = output.getvalue()
+        export_span.set(bytes=len(data))
+        return data
@@ -0,0 +1,104 @@
+"""
+Typed columns for flattened extractions.
+
+The model returns every value as the string printed in the PDF ("1.234.567,89",
+"31/12/2024"), so flattened frames are all object columns. typed_frame() converts
+the columns listed in FIELD_TYPES with vectorized string operations: amounts to
+nullable int64 cents, dates to datetime64 and repetitive text to categoricals.
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from backend.schemas import FIELD_TYPES
+
+# Columns added to every row by the app (source, file name and part label)
+EXTRA_CATEGORY_COLUMNS = ["Fonte", "Arquivo", "Parte"]
+
+# Optional "R$", sign before or after the number (BNB prints debits as "1.234,56-"),
+# thousands separated by dots and up to two decimal places after a comma
+AMOUNT_PATTERN = r"(?:R\$\s*)?-?\s*(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d{1,2})?\s*-?"
+
+DATE_PATTERN = r"\d{2}/\d{2}/\d{4}"
+
+
+def _strings(values) -> pd.Series:
+    return pd.Series(values, dtype="string").str.strip()
+
+
+def parse_amounts(values: pd.Series) -> pd.Series:
+    """
+    Brazilian-format amounts to integer cents ("1.234,5" -> 123450, "10,00-" -> -1000).
+
+    Each distinct string is parsed once (header fields repeat on every row of their
+    record), with string operations over all of them at once.
+
+    Returns:
+        pd.Series: Int64 (nullable) series; missing and unparseable values are <NA>.
+    """
+    codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        return pd.Series(pd.NA, index=values.index, dtype="Int64")
+    text = _strings(uniques)
+    valid = text.str.fullmatch(AMOUNT_PATTERN)
+    # Invalid strings may have any number of digits after a comma ("1,9000%"), so
+    # they are dropped before the number of decimals is used as an exponent
+    digits = text.str.replace(r"[^\d,]", "", regex=True).where(valid)
+    comma = digits.str.find(",")
+    decimals = (digits.str.len() - comma - 1).where(comma >= 0, 0)
+    cents = digits.str.replace(",", "", regex=False).astype("Int64")
+    cents = cents * 10 ** (2 - decimals)
+    cents = cents.mask(text.str.contains("-", regex=False), -cents)
+    return pd.Series(cents.array.take(codes, allow_fill=True), index=values.index)
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    DD/MM/YYYY strings to datetime64. Each distinct string is parsed once, after
+    being rearranged into ISO order (YYYY-MM-DD), which pandas parses without strptime.
+
+    Returns:
+        pd.Series: datetime64 series; missing and unparseable values are NaT.
+    """
+    codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        return pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+    text = _strings(uniques)
+    text = text.where(text.str.fullmatch(DATE_PATTERN))
+    iso = text.str.slice(6, 10) + "-" + text.str.slice(3, 5) + "-" + text.str.slice(0, 2)
+    dates = pd.to_datetime(iso, format="%Y-%m-%d", errors="coerce")
+    return pd.Series(dates.array.take(codes, allow_fill=True), index=values.index)
+
+
+CONVERTERS = {
+    "amount": parse_amounts,
+    "date": parse_dates,
+    # As strings, so part numbers ("Parte") match the Parquet dictionary<string> type
+    "category": lambda values: values.astype("string").astype("category"),
+}
+
+
+def column_types(source: str, columns: Optional[List[str]] = None) -> Dict[str, str]:
+    """Type of each typed column of a source (restricted to `columns` if given)."""
+    types = {column: "category" for column in EXTRA_CATEGORY_COLUMNS}
+    for kind, names in FIELD_TYPES.get(source, {}).items():
+        types.update({name: kind for name in names})
+    if columns is not None:
+        types = {name: kind for name, kind in types.items() if name in columns}
+    return types
+
+
+def typed_frame(frame: pd.DataFrame, source: str) -> pd.DataFrame:
+    """
+    Copy of a flattened frame of `source` with its FIELD_TYPES columns converted.
+    Values that do not parse become missing; a warning reports how many.
+    """
+    typed = frame.copy()
+    for column, kind in column_types(source, frame.columns).items():
+        typed[column] = CONVERTERS[kind](frame[column])
+        if kind != "category":
+            lost = int((frame[column].notna() & typed[column].isna()).sum())
+            if lost:
+                print(f"Warning: {lost} value(s) of '{column}' ({source}) are not a valid {kind}.")
+    return typed
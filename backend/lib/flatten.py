@@ -0,0 +1,140 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from backend.schemas import LIST_KEYS, SCHEMAS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class _Level:
+    """One list expanded into rows: where to find it and which level holds its parent."""
+
+    def __init__(self, key: str, parent: int, path: Tuple[str, ...]):
+        self.key = key
+        self.parent = parent  # -1 for the record itself
+        self.path = path  # Keys from the parent object to the list
+
+
+def _get(obj, path):
+    for key in path:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+class CompiledFlattener:
+    """
+    Flattens extractions of one schema straight into columns.
+
+    Column names, their order and the key path to each value are worked out once
+    from the JSON schema and its LIST_KEYS, so flattening a record is just a walk
+    over known paths that appends to per-column lists; no intermediate dict is
+    built per row, and values of an outer level are read once and repeated over
+    all the rows below them.
+
+    Column names match recursive_expand_rows: lists named in list_keys become one
+    row per item (nested lists multiply), everything else is repeated on each row.
+
+    Unlike recursive_expand_rows, keys that are not in the schema are ignored, and a
+    record whose list is empty yields one row with that list's columns set to None.
+    """
+
+    def __init__(self, schema: dict, list_keys: List[str], sep: str = "."):
+        self.sep = sep
+        self.levels: List[_Level] = []
+        for key in list_keys:
+            parent = -1
+            for index, level in enumerate(self.levels):
+                if key.startswith(level.key + sep):
+                    parent = index
+            prefix = self.levels[parent].key + sep if parent >= 0 else ""
+            self.levels.append(_Level(key, parent, tuple(key[len(prefix):].split(sep))))
+
+        # (column, level, path from that level's object), grouped by level
+        self._accessors: List[Tuple[str, int, Tuple[str, ...]]] = []
+        self._walk(schema, (), -1)
+        self._accessors.sort(key=lambda accessor: accessor[1])
+        self.columns = [column for column, _, _ in self._accessors]
+        self._by_level = [
+            [(column, path) for column, owner, path in self._accessors if owner == level]
+            for level in range(-1, len(self.levels))
+        ]
+
+    def _walk(self, node: dict, path: Tuple[str, ...], level: int) -> None:
+        prefix = self.levels[level].key if level >= 0 else ""
+        if node.get("type", "").lower() == "object" and "properties" in node:
+            for key, child in node["properties"].items():
+                self._walk(child, path + (key,), level)
+            return
+
+        column = self.sep.join(((prefix,) if prefix else ()) + path)
+        if node.get("type", "").lower() == "array":
+            for index, candidate in enumerate(self.levels):
+                if candidate.key == column and candidate.parent == level:
+                    self._walk(node.get("items", {}), (), index)
+                    return
+        self._accessors.append((column, level, path))
+
+    def flatten_into(
+        self, record: dict, columns: Dict[str, list], extra: Optional[dict] = None
+    ) -> int:
+        """
+        Appends the rows of one record to `columns` (column name -> list of values).
+        `extra` values (e.g. file name) are repeated on every row. Returns the row count.
+        """
+        for name in self.columns:
+            columns.setdefault(name, [])
+        layers = [None] * (len(self.levels) + 1)
+        layers[0] = record
+        count = self._emit(layers, 0, columns)
+        self._fill(record, -1, count, columns)
+        for name, value in (extra or {}).items():
+            columns.setdefault(name, []).extend([value] * count)
+        return count
+
+    def _fill(self, obj, level: int, count: int, columns: Dict[str, list]) -> None:
+        """Writes the values owned by one level, repeated over its `count` rows."""
+        for column, path in self._by_level[level + 1]:
+            value = _get(obj, path)
+            if count == 1:
+                columns[column].append(value)
+            else:
+                columns[column].extend([value] * count)
+
+    def _emit(self, layers: list, level: int, columns: Dict[str, list]) -> int:
+        """Emits the rows below the current binding of `layers`; returns their count.
+        Rows come out depth-first, so each item's rows are contiguous."""
+        if level == len(self.levels):
+            return 1
+
+        spec = self.levels[level]
+        items = _get(layers[spec.parent + 1], spec.path)
+        if not items or not isinstance(items, list):
+            items = [None]
+
+        count = 0
+        for item in items:
+            layers[level + 1] = item
+            rows = self._emit(layers, level + 1, columns)
+            self._fill(item, level, rows, columns)
+            count += rows
+        return count
+
+    def to_frame(self, records: List[dict]) -> "pd.DataFrame":
+        """Flattens all records and builds the DataFrame in one go."""
+        import pandas as pd
+
+        columns: Dict[str, list] = {}
+        for record in records:
+            self.flatten_into(record, columns)
+        if not columns:
+            return pd.DataFrame(columns=self.columns)
+        return pd.DataFrame(columns)
+
+
+@lru_cache(maxsize=None)
+def get_flattener(source: str) -> CompiledFlattener:
+    """Compiled flattener for a SCHEMAS entry ('BNB', 'BNDES' or 'FDNE')."""
+    return CompiledFlattener(SCHEMAS[source], LIST_KEYS[source])
@@ -1,8 +1,15 @@
-import pandas as pd
+import hashlib
+import mmap
+import multiprocessing
+import os
 import pypdf
 import re
 import io
-from typing import List, Optional, Tuple
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from backend.config import SPLIT_PARALLEL_MIN_PAGES, SPLIT_WORKERS
 
 def flatten_json(y, parent_key="", sep="."):
     """Recursively flattens a nested dictionary into a single dictionary with compound keys."""
@@ -68,22 +75,26 @@ def recursive_expand_rows(data, list_keys, sep="."):
 
 
 
+# Regex:
+# (?:P[aá]g|Pagina) - Matches "Pag", "Pág", or "Pagina" (non-capturing group)
+# \.?              - Matches an optional dot
+# \s*               - Matches zero or more whitespace characters
+# (\d+)             - Captures the current page number (Group 1)
+# \s*de\s*          - Matches " de " with flexible spacing
+# (\d+)             - Captures the total pages (Group 2)
+# re.IGNORECASE     - Makes the search case-insensitive
+PAGE_NUMBERING_PATTERN = re.compile(
+    r"(?:P[aá]g|Pagina)\.?\s*(\d+)\s*de\s*(\d+)", re.IGNORECASE
+)
+
+
 def find_page_numbering(text: str) -> Optional[Tuple[int, int]]:
     """
     Searches for 'Pág X de Y' or similar patterns in the text.
     Returns (page_number, total_pages) if found, otherwise None.
     Handles variations like Pág/Pag./Pagina, accents, and spacing.
     """
-    # Regex:
-    # (?:P[aá]g|Pagina) - Matches "Pag", "Pág", or "Pagina" (non-capturing group)
-    # \.?              - Matches an optional dot
-    # \s*               - Matches zero or more whitespace characters
-    # (\d+)             - Captures the current page number (Group 1)
-    # \s*de\s*          - Matches " de " with flexible spacing
-    # (\d+)             - Captures the total pages (Group 2)
-    # re.IGNORECASE     - Makes the search case-insensitive
-    pattern = re.compile(r"(?:P[aá]g|Pagina)\.?\s*(\d+)\s*de\s*(\d+)", re.IGNORECASE)
-    match = pattern.search(text)
+    match = PAGE_NUMBERING_PATTERN.search(text)
     if match:
         try:
             page_num = int(match.group(1))
@@ -93,90 +104,420 @@ def find_page_numbering(text: str) -> Optional[Tuple[int, int]]:
             return None
     return None
 
-def split_pdf_in_memory(pdf_bytes: bytes) -> List[io.BytesIO]:
+
+# Text-showing operators in a raw content stream: a TJ array (kerned pieces of one
+# run of text) or a single literal string shown with Tj, ' or "
+TEXT_OPERATOR_PATTERN = re.compile(
+    rb"\[((?:\\.|[^\]\\])*)\]\s*TJ|\(((?:\\.|[^\\)])*)\)\s*(?:Tj|'|\")", re.DOTALL
+)
+LITERAL_STRING_PATTERN = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.DOTALL)
+STRING_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{1,3}|.)", re.DOTALL)
+STRING_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+def _unescape_literal(raw: bytes) -> str:
+    def replace(match):
+        escaped = match.group(1)
+        if escaped[:1].isdigit():
+            return bytes([int(escaped, 8) & 0xFF])
+        return STRING_ESCAPES.get(escaped, escaped)
+
+    return STRING_ESCAPE_PATTERN.sub(replace, raw).decode("latin-1")
+
+
+def scan_page_numbering(page: pypdf.PageObject) -> Optional[Tuple[int, int]]:
     """
-    Splits a PDF (provided as bytes) based on finding 'Page 1 of Y' patterns.
+    Looks for 'Pág X de Y' directly in the page's raw content stream, without
+    running pypdf's text extraction and layout.
 
-    Args:
-        pdf_bytes (bytes): The content of the concatenated input PDF file.
+    Only literal strings in single-byte encodings can be read this way; pages whose
+    text is hex/CID-encoded simply return None, and callers fall back to full
+    extraction.
+    """
+    contents = page.get_contents()
+    if contents is None:
+        return None
+    data = contents.get_data()
+    if b"g" not in data:  # Cheap rejection: no 'Pag'/'Pág'/'Pagina' can be shown
+        return None
+
+    runs = []
+    for match in TEXT_OPERATOR_PATTERN.finditer(data):
+        if match.group(1) is not None:
+            runs.append(
+                "".join(
+                    _unescape_literal(piece)
+                    for piece in LITERAL_STRING_PATTERN.findall(match.group(1))
+                )
+            )
+        else:
+            runs.append(_unescape_literal(match.group(2)))
+    return find_page_numbering(" ".join(runs))
+
+
+def read_page_numbering(
+    reader: pypdf.PdfReader, index: int, fast_scan: bool = True
+) -> Optional[Tuple[int, int]]:
+    """
+    Returns the (page_number, total_pages) printed on one page, if any.
 
-    Returns:
-        List[io.BytesIO]: A list of BytesIO streams, each containing a sub-document.
-                          Returns a list with a single BytesIO stream containing the
-                          original PDF if no splitting boundaries are found or on error.
+    With fast_scan, the raw content stream is searched first (scan_page_numbering)
+    and the full text is only extracted when that finds nothing.
     """
-    sub_documents = []
-    original_stream = io.BytesIO(pdf_bytes)
+    try:
+        page = reader.pages[index]
+        if fast_scan:
+            numbering = scan_page_numbering(page)
+            if numbering:
+                return numbering
+        text = page.extract_text()
+        if not text:
+            return None
+        return find_page_numbering(text)
+    except Exception as e:
+        print(f"Warning: Error processing page {index + 1} for splitting: {e}")
+        return None
+
 
+def iter_boundaries_linear(reader: pypdf.PdfReader, fast_scan: bool = True) -> Iterator[int]:
+    """Reads every page and yields the start index of each sub-document as it is found."""
+    yield 0  # Start index of the first sub-document
+    for i in range(1, len(reader.pages)):
+        numbering = read_page_numbering(reader, i, fast_scan)
+        if numbering and numbering[0] == 1:
+            yield i
+
+
+def iter_boundaries_jump(reader: pypdf.PdfReader, fast_scan: bool = True) -> Iterator[int]:
+    """
+    Yields the start index of each sub-document, using the 'Pág 1 de Y' total
+    to jump straight to the next expected boundary.
+
+    A jump is only accepted if the page before the expected boundary reads 'Y de Y'
+    and the expected boundary itself reads 'Pág 1 de ...'. Otherwise the pages after
+    the current start are scanned one by one until the next 'Pág 1' is found, as
+    iter_boundaries_linear does.
+
+    The pages inside an accepted jump are never read, so on corrupted numbering the
+    boundaries can differ from iter_boundaries_linear: a stray 'Pág 1 de N' inside
+    a statement whose first and last pages agree is not split on here, but is there.
+    """
+    num_pages_total = len(reader.pages)
+    numbering_by_page = {}
+
+    def numbering(index):
+        if index not in numbering_by_page:
+            numbering_by_page[index] = read_page_numbering(reader, index, fast_scan)
+        return numbering_by_page[index]
+
+    yield 0
+    start = 0
+    while start < num_pages_total:
+        first = numbering(start)
+        if first and first[0] == 1 and first[1] > 0:
+            total_pages = first[1]
+            expected = start + total_pages
+            if expected >= num_pages_total:
+                if expected == num_pages_total and numbering(expected - 1) == (
+                    total_pages,
+                    total_pages,
+                ):
+                    break
+            elif numbering(expected - 1) == (total_pages, total_pages) and (
+                (numbering(expected) or (0, 0))[0] == 1
+            ):
+                yield expected
+                start = expected
+                continue
+
+        # Jump not possible or not confirmed: fall back to a linear scan
+        next_start = start + 1
+        while next_start < num_pages_total:
+            found = numbering(next_start)
+            if found and found[0] == 1:
+                break
+            next_start += 1
+        if next_start < num_pages_total:
+            yield next_start
+        start = next_start
+
+
+def _chunk_numbering(
+    path: str, start: int, end: int, fast_scan: bool
+) -> List[Optional[Tuple[int, int]]]:
+    """Process pool task: page numbering of pages start..end-1 of the PDF at path,
+    read through a memory map so the worker never loads the whole file."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        reader = pypdf.PdfReader(data)
+        numbering = [read_page_numbering(reader, i, fast_scan) for i in range(start, end)]
+        del reader  # Drop references into the map before it is closed
+    return numbering
+
+
+def iter_boundaries_parallel(
+    pdf_bytes: bytes, num_pages: int, workers: int, fast_scan: bool = True
+) -> Iterator[int]:
+    """
+    Same boundaries as iter_boundaries_linear, with the pages read by `workers`
+    processes. The PDF is written once to a temporary file that every worker maps
+    and opens with its own PdfReader; pages are handed out in chunks, and chunk
+    results are consumed in page order, so boundaries are still yielded as soon as
+    the chunks before them are done.
+    """
+    chunk = max(1, -(-num_pages // (workers * 4)))  # Several chunks per worker, to balance
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf_bytes)
     try:
-        reader = pypdf.PdfReader(original_stream)
-        num_pages_total = len(reader.pages)
-        # print(f"Total pages found: {num_pages_total}") # Optional: for debugging
+        # Spawned, not forked: the caller (the pipeline) runs threads
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                (start, pool.submit(_chunk_numbering, f.name, start, min(start + chunk, num_pages), fast_scan))
+                for start in range(0, num_pages, chunk)
+            ]
+            yield 0
+            for start, future in futures:
+                for index, numbering in enumerate(future.result(), start):
+                    if index > 0 and numbering and numbering[0] == 1:
+                        yield index
+    finally:
+        os.remove(f.name)
 
-        boundaries = [0] # Start index of the first sub-document
 
-        for i in range(num_pages_total):
-            try:
-                page = reader.pages[i]
-                text = page.extract_text()
-                if not text:
-                    # print(f"Warning: Could not extract text from page {i + 1}.") # Optional
-                    continue
+def find_boundaries_linear(reader: pypdf.PdfReader, fast_scan: bool = True) -> List[int]:
+    """Reads every page and returns the start index of each sub-document."""
+    return list(iter_boundaries_linear(reader, fast_scan))
 
-                numbering = find_page_numbering(text)
 
-                if numbering:
-                    page_num, total_pages = numbering
-                    if page_num == 1 and i > 0:
-                        # print(f"  Found boundary marker 'Page 1 of {total_pages}' on page {i + 1}.") # Optional
-                        boundaries.append(i)
+def find_boundaries_jump(reader: pypdf.PdfReader, fast_scan: bool = True) -> List[int]:
+    """List version of iter_boundaries_jump."""
+    return list(iter_boundaries_jump(reader, fast_scan))
 
-            except Exception as e:
-                print(f"Warning: Error processing page {i + 1} for splitting: {e}")
-                continue # Continue to next page
 
-        boundaries.append(num_pages_total)
-        # print(f"Identified boundaries (start page indices): {boundaries}") # Optional
+def first_pages_pdf(pdf_bytes: bytes, max_pages: int) -> bytes:
+    """
+    Returns a PDF containing only the first max_pages pages of the input.
 
-        # --- Splitting and Creating In-Memory Streams ---
-        num_subdocs = len(boundaries) - 1
+    The original bytes are returned unchanged if max_pages is 0, the document is
+    already short enough, or it cannot be read.
+    """
+    if max_pages <= 0:
+        return pdf_bytes
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+        if len(reader.pages) <= max_pages:
+            return pdf_bytes
+        writer = pypdf.PdfWriter()
+        for page in reader.pages[:max_pages]:
+            writer.add_page(page)
+        output_stream = io.BytesIO()
+        writer.write(output_stream)
+        writer.close()
+        return output_stream.getvalue()
+    except Exception as e:
+        print(f"Warning: Could not trim PDF to its first {max_pages} page(s): {e}")
+        return pdf_bytes
 
-        # If only one document is found (or no boundaries after page 1)
-        if num_subdocs <= 1:
-            print("Info: No effective split boundaries found. Returning original PDF content.")
-            original_stream.seek(0) # Ensure stream is at the beginning
-            return [original_stream]
+WHITESPACE_PATTERN = re.compile(rb"\s+")
 
-        print(f"Splitting into {num_subdocs} sub-document(s)...") # Optional
 
-        for i in range(num_subdocs):
-            start_page = boundaries[i]
-            end_page = boundaries[i + 1]
+def _stream_digest(obj) -> bytes:
+    try:
+        return hashlib.sha256(obj.get_object().get_data()).digest()
+    except Exception:
+        return b""
+
+
+def _resources_digest(resources, hasher, depth: int = 0) -> None:
+    """Feeds the fonts (name and ToUnicode map) and XObjects (their data) of a page
+    into hasher, so pages drawing different images or glyph mappings never match."""
+    if resources is None or depth > 3:
+        return
+    resources = resources.get_object()
+    fonts = resources.get("/Font")
+    for name, font in sorted((fonts.get_object() if fonts else {}).items()):
+        font = font.get_object()
+        hasher.update(name.encode() + str(font.get("/BaseFont")).encode())
+        if "/ToUnicode" in font:
+            hasher.update(_stream_digest(font["/ToUnicode"]))
+    xobjects = resources.get("/XObject")
+    for name, xobject in sorted((xobjects.get_object() if xobjects else {}).items()):
+        hasher.update(name.encode() + _stream_digest(xobject))
+        _resources_digest(xobject.get_object().get("/Resources"), hasher, depth + 1)
+
+
+def page_fingerprint(page: pypdf.PageObject) -> str:
+    """
+    Hash of what a page draws: its content stream with whitespace normalized, plus
+    the fonts and images it uses. The same page has the same fingerprint whether it
+    sits in a standalone statement or inside a concatenated export.
+    """
+    hasher = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        hasher.update(WHITESPACE_PATTERN.sub(b" ", contents.get_data()).strip())
+    _resources_digest(page.get("/Resources"), hasher)
+    return hasher.hexdigest()
 
-            if start_page >= end_page:
-                # print(f"Warning: Skipping empty sub-document range starting at page {start_page + 1}.") # Optional
-                continue
 
-            writer = pypdf.PdfWriter()
-            # print(f"  Creating sub-document {i + 1} (Pages {start_page + 1} to {end_page})...") # Optional
-            for page_index in range(start_page, end_page):
-                writer.add_page(reader.pages[page_index])
+def document_fingerprint(pdf_bytes: bytes) -> str:
+    """
+    Fingerprint of a PDF from its pages (see page_fingerprint), so re-serialized
+    copies of the same pages match. Falls back to the SHA-256 of the bytes.
+    """
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+        hasher = hashlib.sha256(b"pages")
+        for page in reader.pages:
+            hasher.update(page_fingerprint(page).encode())
+        return hasher.hexdigest()
+    except Exception:
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def page_windows(pdf_bytes: bytes, window_pages: int, overlap: int) -> List[bytes]:
+    """
+    Cuts a PDF into windows of window_pages consecutive pages, each one starting
+    `overlap` pages before the previous one ends, so rows near a window edge are
+    seen whole by at least one window.
+
+    The original bytes are returned alone if window_pages is 0, the document is
+    not longer than one window, or it cannot be read.
+    """
+    if window_pages <= 0:
+        return [pdf_bytes]
+    overlap = max(0, min(overlap, window_pages - 1))
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+        num_pages = len(reader.pages)
+        if num_pages <= window_pages:
+            return [pdf_bytes]
+        windows = []
+        step = window_pages - overlap
+        for start_page in range(0, num_pages - overlap, step):
+            end_page = min(start_page + window_pages, num_pages)
+            windows.append(_write_pages(reader, start_page, end_page).getvalue())
+        return windows
+    except Exception as e:
+        print(f"Warning: Could not cut PDF into {window_pages}-page windows: {e}")
+        return [pdf_bytes]
+
+
+def _write_pages(reader: pypdf.PdfReader, start_page: int, end_page: int) -> io.BytesIO:
+    writer = pypdf.PdfWriter()
+    for page_index in range(start_page, end_page):
+        writer.add_page(reader.pages[page_index])
+
+    # Write to an in-memory stream
+    output_stream = io.BytesIO()
+    writer.write(output_stream)
+    output_stream.seek(0)  # Rewind stream to the beginning for reading
+    writer.close()  # Good practice to close writer
+    return output_stream
 
-            # Write to an in-memory stream
-            output_stream = io.BytesIO()
-            writer.write(output_stream)
-            output_stream.seek(0) # Rewind stream to the beginning for reading
-            sub_documents.append(output_stream)
-            writer.close() # Good practice to close writer
 
-        print("Splitting complete.") # Optional
-        return sub_documents
+def _can_spawn_workers() -> bool:
+    # Daemon processes cannot start children (multiprocessing refuses to)
+    if multiprocessing.current_process().daemon:
+        print("Warning: Parallel split is not available in a daemon process; reading pages here.")
+        return False
+    return True
 
-    except pypdf.errors.PdfReadError as e:
+
+def iter_split_pdf(
+    pdf_bytes: bytes,
+    jump_ahead: bool = True,
+    fast_scan: bool = True,
+    workers: int = SPLIT_WORKERS,
+) -> Iterator[Tuple[io.BytesIO, Tuple[int, int]]]:
+    """
+    Splits a PDF (provided as bytes) based on finding 'Page 1 of Y' patterns,
+    yielding each sub-document as soon as the boundary that closes it is found.
+
+    Only one sub-document is built at a time, so consumers can start working on
+    the first part while later pages are still being scanned.
+
+    Args:
+        pdf_bytes (bytes): The content of the concatenated input PDF file.
+        jump_ahead (bool): Use the 'Pág 1 de Y' total to only read the pages around
+                           each expected boundary (see iter_boundaries_jump) instead
+                           of extracting the text of every page.
+        fast_scan (bool): Search each page's raw content stream for the numbering
+                          before falling back to full text extraction.
+        workers (int): With more than 1, PDFs of at least SPLIT_PARALLEL_MIN_PAGES
+                       pages have every page read by that many processes (see
+                       iter_boundaries_parallel) instead of jumping ahead.
+
+    Yields:
+        Tuple[io.BytesIO, Tuple[int, int]]: The sub-document stream and its page range
+                                            as (start index, end index exclusive).
+                                            If no boundary is found, or the PDF cannot
+                                            be read, the original PDF is yielded alone.
+    """
+    original_stream = io.BytesIO(pdf_bytes)
+
+    try:
+        reader = pypdf.PdfReader(original_stream)
+        num_pages_total = len(reader.pages)
+    except Exception as e:
         print(f"Error: Failed to read PDF for splitting. It might be corrupted. Details: {e}")
         original_stream.seek(0)
-        return [original_stream] # Return original on read error
+        yield original_stream, (0, 0)  # Yield original on read error
+        return
+
+    if workers > 1 and num_pages_total >= SPLIT_PARALLEL_MIN_PAGES and _can_spawn_workers():
+        boundaries = iter_boundaries_parallel(pdf_bytes, num_pages_total, workers, fast_scan)
+    elif jump_ahead:
+        boundaries = iter_boundaries_jump(reader, fast_scan)
+    else:
+        boundaries = iter_boundaries_linear(reader, fast_scan)
+
+    start_page = 0
+    try:
+        next(boundaries)  # Always page 0
+        for end_page in boundaries:
+            if start_page >= end_page:
+                continue
+            yield _write_pages(reader, start_page, end_page), (start_page, end_page)
+            start_page = end_page
     except Exception as e:
         print(f"An unexpected error occurred during splitting: {e}")
-        original_stream.seek(0)
-        return [original_stream] # Return original on other errors
\ No newline at end of file
+
+    # Last sub-document (the whole PDF if no boundary was found)
+    if start_page == 0:
+        original_stream.seek(0)  # Ensure stream is at the beginning
+        yield original_stream, (0, num_pages_total)
+    elif start_page < num_pages_total:
+        yield _write_pages(reader, start_page, num_pages_total), (
+            start_page,
+            num_pages_total,
+        )
+
+
+def split_pdf_in_memory(
+    pdf_bytes: bytes,
+    jump_ahead: bool = True,
+    fast_scan: bool = True,
+    workers: int = SPLIT_WORKERS,
+) -> List[io.BytesIO]:
+    """
+    Splits a PDF (provided as bytes) based on finding 'Page 1 of Y' patterns.
+
+    Args:
+        pdf_bytes (bytes): The content of the concatenated input PDF file.
+        jump_ahead (bool): See iter_split_pdf.
+        fast_scan (bool): See iter_split_pdf.
+        workers (int): See iter_split_pdf.
+
+    Returns:
+        List[io.BytesIO]: A list of BytesIO streams, each containing a sub-document.
+                          Returns a list with a single BytesIO stream containing the
+                          original PDF if no splitting boundaries are found or on error.
+    """
+    sub_documents = [
+        stream for stream, _ in iter_split_pdf(pdf_bytes, jump_ahead, fast_scan, workers)
+    ]
+    if len(sub_documents) == 1:
+        print("Info: No effective split boundaries found. Returning original PDF content.")
+    else:
+        print(f"Split into {len(sub_documents)} sub-document(s).")
+    return sub_documents
@@ -0,0 +1,79 @@
+import io
+import re
+from typing import Optional, Tuple
+
+import pypdf
+
+from backend.config import HEURISTIC_CLASSIFIER_PAGES
+
+# (pattern, weight) rules per source, matched against the text of the first pages.
+# Names of the issuing institution weigh the most; table headings that only one
+# statement layout prints add supporting evidence. FDNE statements are operated by
+# Banco do Nordeste, so the BNB name alone is not decisive against FDNE.
+RULES = {
+    "BNB": [
+        (re.compile(r"banco\s+do\s+nordeste", re.IGNORECASE), 1),
+        (re.compile(r"\bBNB\b"), 1),
+        (re.compile(r"[áa]rea\s+de\s+cr[ée]dito", re.IGNORECASE), 2),
+        (re.compile(r"c[óo]digo\s+da\s+opera[çc][ãa]o", re.IGNORECASE), 1),
+        (re.compile(r"saldo\s+(?:em\s+)?atraso", re.IGNORECASE), 2),
+        (re.compile(r"preju[íi]zo", re.IGNORECASE), 1),
+        (re.compile(r"jus\s*/\s*bas\s*/\s*var", re.IGNORECASE), 2),
+    ],
+    "BNDES": [
+        (re.compile(r"\bBNDES\b"), 3),
+        (re.compile(r"banco\s+nacional\s+de\s+desenvolvimento", re.IGNORECASE), 3),
+        (re.compile(r"subcr[ée]dito", re.IGNORECASE), 2),
+        (re.compile(r"taxa\s+(?:do\s+)?agente", re.IGNORECASE), 1),
+        (re.compile(r"custo\s+financeiro", re.IGNORECASE), 1),
+        (re.compile(r"car[êe]ncia", re.IGNORECASE), 1),
+    ],
+    "FDNE": [
+        (re.compile(r"\bFDNE\b"), 3),
+        (re.compile(r"fundo\s+de\s+desenvolvimento\s+do\s+nordeste", re.IGNORECASE), 3),
+        (re.compile(r"\bSUDENE\b", re.IGNORECASE), 1),
+        (re.compile(r"saldo\s+capitalizado", re.IGNORECASE), 2),
+        (re.compile(r"saldo\s+devedor", re.IGNORECASE), 1),
+    ],
+}
+
+# Added to the total score when computing confidence, so a single weak match
+# is never confident on its own
+PRIOR_WEIGHT = 2
+
+def first_pages_text(pdf_bytes: bytes, max_pages: int = HEURISTIC_CLASSIFIER_PAGES) -> str:
+    """Extracts the text of the first max_pages pages. Returns '' if unreadable."""
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+        texts = []
+        for page in reader.pages[:max_pages]:
+            texts.append(page.extract_text() or "")
+        return "\n".join(texts)
+    except Exception as e:
+        print(f"Warning: Could not read PDF text for local classification: {e}")
+        return ""
+
+
+def score_text(text: str) -> dict:
+    """Returns the summed rule weights for each source."""
+    return {
+        source: sum(weight for pattern, weight in rules if pattern.search(text))
+        for source, rules in RULES.items()
+    }
+
+
+def classify_locally(pdf_bytes: bytes) -> Tuple[Optional[str], float]:
+    """
+    Classifies a statement from the text of its first pages, without calling the LLM.
+
+    Returns:
+        Tuple[Optional[str], float]: The best-scoring source ('BNB', 'BNDES' or 'FDNE')
+                                     and a confidence in [0, 1), or (None, 0.0) if no
+                                     rule matched.
+    """
+    scores = score_text(first_pages_text(pdf_bytes))
+    source, best = max(scores.items(), key=lambda item: item[1])
+    if best == 0:
+        return None, 0.0
+    return source, best / (sum(scores.values()) + PRIOR_WEIGHT)
+
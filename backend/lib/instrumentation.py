@@ -0,0 +1,200 @@
+"""
+Per-stage timing and token accounting.
+
+Code under measurement opens spans:
+
+    with span("extract", source="BNB") as s:
+        ...
+        s.set(input_tokens=1234)
+
+Every finished span becomes a flat record (stage, seconds, attributes) that is
+logged as JSON on the "loan_reader.metrics" logger, passed to every exporter
+registered with add_exporter(), and, inside `with metrics_run() as run:`, kept on
+the run so run.summary() can aggregate it per stage.
+
+The active run and span live in context variables, so tasks submitted to a thread
+pool must run inside contextvars.copy_context() to be attributed to the run.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from backend.config import LOG_LEVEL, METRICS_FILE
+
+logger = logging.getLogger("loan_reader.metrics")
+
+# Attributes summed per stage in RunMetrics.summary()
+SUMMED_ATTRIBUTES = [
+    "fast_path", "parsed_locally", "retries", "throttled", "input_tokens", "output_tokens",
+    "bytes_sent", "parts_deduplicated", "llm_calls_saved",
+]
+
+# Attributes whose value splits a stage into separate summary rows, e.g. "llm_call[text]"
+GROUPED_ATTRIBUTES = ["input_mode"]
+
+_current_run: ContextVar[Optional["RunMetrics"]] = ContextVar("loan_reader_run", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("loan_reader_span", default=None)
+_exporters: List[Callable[[dict], None]] = []
+
+
+class Span:
+    def __init__(self, stage: str, attributes: dict):
+        self.stage = stage
+        self.attributes = attributes
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, **counts) -> None:
+        for key, value in counts.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+
+def _row_stage(record: dict) -> str:
+    variants = [str(record[key]) for key in GROUPED_ATTRIBUTES if record.get(key)]
+    return f"{record['stage']}[{','.join(variants)}]" if variants else record["stage"]
+
+
+class RunMetrics:
+    """Span records of one processing run (e.g. one batch of uploads)."""
+
+    def __init__(self, name: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started_at = time.time()
+        self.records: List[dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self) -> List[Dict]:
+        """One row per stage: call count, wall time, errors, cache hits and summed counters."""
+        with self._lock:
+            records = list(self.records)
+        rows: Dict[str, dict] = {}
+        for record in records:
+            stage = _row_stage(record)
+            row = rows.setdefault(
+                stage,
+                {"stage": stage, "count": 0, "total_s": 0.0, "max_s": 0.0,
+                 "errors": 0, "cache_hits": 0, **{key: 0 for key in SUMMED_ATTRIBUTES}},
+            )
+            row["count"] += 1
+            row["total_s"] += record["seconds"]
+            row["max_s"] = max(row["max_s"], record["seconds"])
+            row["errors"] += "error" in record
+            row["cache_hits"] += bool(record.get("cache_hit"))
+            for key in SUMMED_ATTRIBUTES:
+                row[key] += record.get(key) or 0
+        for row in rows.values():
+            row["mean_s"] = row["total_s"] / row["count"]
+        return list(rows.values())
+
+
+def combine_summaries(summaries: List[List[Dict]]) -> List[Dict]:
+    """Adds up RunMetrics.summary() rows of several runs (e.g. one per job file) per stage."""
+    counters = ["count", "total_s", "errors", "cache_hits", *SUMMED_ATTRIBUTES]
+    rows: Dict[str, dict] = {}
+    for summary in summaries:
+        for row in summary:
+            total = rows.setdefault(
+                row["stage"], {"stage": row["stage"], "max_s": 0.0, **{key: 0 for key in counters}}
+            )
+            for key in counters:
+                total[key] += row.get(key) or 0
+            total["max_s"] = max(total["max_s"], row["max_s"])
+    for row in rows.values():
+        row["mean_s"] = row["total_s"] / row["count"] if row["count"] else 0.0
+    return list(rows.values())
+
+
+def add_exporter(exporter: Callable[[dict], None]) -> None:
+    """Registers a callable that receives every finished span record (a flat dict)."""
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: Callable[[dict], None]) -> None:
+    _exporters.remove(exporter)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def metrics_run(name: str = ""):
+    """Collects every span opened in this context (and in tasks copying it) into a RunMetrics."""
+    run = RunMetrics(name)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        logger.info(json.dumps(
+            {"event": "run_summary", "run_id": run.id, "name": name, "stages": run.summary()},
+            default=str,
+        ))
+
+
+@contextmanager
+def span(stage: str, **attributes):
+    current = Span(stage, attributes)
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        run = _current_run.get()
+        record = {
+            "stage": stage,
+            "seconds": time.perf_counter() - start,
+            "run_id": run.id if run else None,
+            **current.attributes,
+        }
+        if run is not None:
+            run.record(record)
+        logger.info(json.dumps(record, default=str, ensure_ascii=False))
+        for exporter in list(_exporters):
+            try:
+                exporter(record)
+            except Exception as e:
+                logger.warning(f"Metrics exporter {exporter!r} failed: {e}")
+
+
+class JsonLinesExporter:
+    """Appends each span record as one JSON line to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """
+    Sends log records to stderr (unless the root logger already has a handler) and
+    sets the level of the "loan_reader" loggers. Called by the entry points: the
+    CLI, the job workers and the app.
+    """
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("loan_reader").setLevel(level.upper())
+
+
+if METRICS_FILE:
+    add_exporter(JsonLinesExporter(METRICS_FILE))
@@ -0,0 +1,405 @@
+"""
+Durable job queue for batch processing, stored in SQLite.
+
+An upload becomes a job with one row per file, and the PDF bytes are stored with
+it. Worker processes (see backend/worker.py) claim pending files, run the pipeline
+on them and store every part as soon as it finishes, so a batch keeps going when
+the browser tab is closed and resumes after a server restart: files left "running"
+by a dead worker stop sending heartbeats and are claimed again. Parts that were
+already extracted before the restart come back from the extraction cache.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.config import (
+    JOB_BATCH_FILES,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOBS_DB,
+    JOBS_MAX_AGE_DAYS,
+)
+
+FILE_STATES = ["pending", "running", "done", "failed"]
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        created_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        sha256 TEXT PRIMARY KEY,
+        data BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        sha256 TEXT NOT NULL,
+        state TEXT NOT NULL,
+        forced INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        heartbeat REAL,
+        metrics TEXT,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS files_by_state ON files (state, id)",
+    "CREATE INDEX IF NOT EXISTS files_by_job ON files (job_id, position)",
+    "CREATE INDEX IF NOT EXISTS files_by_hash ON files (sha256, state)",
+    """
+    CREATE TABLE IF NOT EXISTS parts (
+        file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+        part_index INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        part TEXT NOT NULL,
+        PRIMARY KEY (file_id, part_index)
+    )
+    """,
+]
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class JobStore:
+    """
+    SQLite-backed jobs, files and parts. Safe to share between threads; the web app
+    and any number of worker processes may open the same database.
+    """
+
+    def __init__(self, path: str = JOBS_DB):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._transaction() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(files)")]
+            if "forced" not in columns:  # Databases created before reprocessing was forced
+                conn.execute("ALTER TABLE files ADD COLUMN forced INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def create_job(self, files: Iterable[Tuple[str, bytes]], force: bool = False) -> str:
+        """
+        Stores the files of one upload as a new job and returns its id.
+
+        Unless force is set, a file whose content was already processed successfully
+        (in any job) is not queued again: its stored parts are copied over. Forced
+        files are processed from scratch (see claim).
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO jobs VALUES (?, ?)", (job_id, now))
+            for position, (name, data) in enumerate(files):
+                digest = hashlib.sha256(data).hexdigest()
+                conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)", (digest, data))
+                previous = None if force else self._latest_done(digest)
+                cursor = conn.execute(
+                    "INSERT INTO files (job_id, position, name, sha256, state, forced, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, position, name, digest, "done" if previous else "pending", force, now),
+                )
+                if previous:
+                    self._copy_parts(previous, cursor.lastrowid)
+        return job_id
+
+    def _latest_done(self, digest: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT id FROM files WHERE sha256 = ? AND state = 'done' ORDER BY id DESC LIMIT 1",
+            (digest,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _copy_parts(self, source_id: int, target_id: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO parts SELECT ?, part_index, state, part FROM parts"
+            " WHERE file_id = ?",
+            (target_id, source_id),
+        )
+
+    def claim(self, worker: str) -> Optional[Tuple[int, str, bytes, bool]]:
+        """Claims a single file (see claim_batch): (file id, name, PDF bytes, forced) or None."""
+        claimed = self.claim_batch(worker, 1)
+        return claimed[0] if claimed else None
+
+    def claim_batch(
+        self, worker: str, limit: int = JOB_BATCH_FILES
+    ) -> List[Tuple[int, str, bytes, bool]]:
+        """
+        Marks up to `limit` files as running for `worker`, to be processed together,
+        and returns (file id, name, PDF bytes, forced) for each; an empty list if
+        there is nothing to do.
+
+        The batch starts with the oldest pending file (or one whose worker stopped
+        sending heartbeats) and takes the next ones of the same job, all forced or
+        all not. Files whose content another worker is processing right now wait,
+        and files already processed in another job are completed from its stored
+        parts without running the pipeline again, unless they are forced
+        (reprocessed): those must be extracted anew, without the extraction cache
+        either.
+        """
+        now = time.time()
+        stale = now - JOB_LEASE_SECONDS
+        claimed: List[Tuple[int, str, bytes, bool]] = []
+        job_id = batch_forced = None
+        with self._transaction() as conn:
+            while len(claimed) < limit:
+                row = conn.execute(
+                    """
+                    SELECT id, job_id, name, sha256, forced, attempts FROM files
+                    WHERE (state = 'pending' OR (state = 'running' AND heartbeat < ?))
+                      AND sha256 NOT IN (
+                          SELECT sha256 FROM files
+                          WHERE state = 'running' AND heartbeat >= ? AND worker IS NOT ?
+                      )
+                      AND (? IS NULL OR (job_id = ? AND forced = ?))
+                    ORDER BY id LIMIT 1
+                    """,
+                    (stale, stale, worker, job_id, job_id, batch_forced),
+                ).fetchone()
+                if row is None:
+                    break
+                file_id, file_job_id, name, digest, forced, attempts = row
+                previous = None if forced else self._latest_done(digest)
+                if previous is not None:
+                    conn.execute("DELETE FROM parts WHERE file_id = ?", (file_id,))
+                    self._copy_parts(previous, file_id)
+                    self._set_state(file_id, "done", None)
+                    continue
+                if attempts >= JOB_MAX_ATTEMPTS:
+                    # Most likely crashes the worker processing it; stop retrying
+                    self._set_state(
+                        file_id, "failed",
+                        f"Processamento interrompido {attempts} vezes; arquivo não processado.",
+                    )
+                    continue
+                conn.execute(
+                    "UPDATE files SET state = 'running', worker = ?, heartbeat = ?,"
+                    " attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (worker, now, now, file_id),
+                )
+                data = conn.execute(
+                    "SELECT data FROM blobs WHERE sha256 = ?", (digest,)
+                ).fetchone()[0]
+                claimed.append((file_id, name, data, bool(forced)))
+                job_id, batch_forced = file_job_id, forced
+        return claimed
+
+    def _set_state(self, file_id: int, state: str, error: Optional[str]) -> None:
+        self._conn.execute(
+            "UPDATE files SET state = ?, error = ?, updated_at = ? WHERE id = ?",
+            (state, error, time.time(), file_id),
+        )
+
+    def _owned(self, file_id: int, worker: str, running: bool = True) -> bool:
+        """
+        True if `worker` still holds its claim on the file. A file that was reprocessed,
+        or handed to another worker after missing heartbeats, is no longer written to
+        by the run that claimed it before.
+        """
+        row = self._conn.execute(
+            "SELECT state FROM files WHERE id = ? AND worker = ?", (file_id, worker)
+        ).fetchone()
+        return row is not None and (row[0] == "running" or not running)
+
+    def heartbeat(self, worker: str, file_ids: Iterable[int]) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE files SET heartbeat = ? WHERE id = ? AND worker = ? AND state = 'running'",
+                [(now, file_id, worker) for file_id in file_ids],
+            )
+
+    def save_part(self, worker: str, file_id: int, part_index: int, part: dict) -> bool:
+        """
+        Stores one finished (or failed) part while the rest of the file is still running.
+        Returns False, storing nothing, if `worker` no longer holds the file (see _owned).
+        """
+        with self._transaction() as conn:
+            if not self._owned(file_id, worker):
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?)",
+                (file_id, part_index, "failed" if "Erro" in part else "done",
+                 json.dumps(part, ensure_ascii=False)),
+            )
+            conn.execute(
+                "UPDATE files SET heartbeat = ? WHERE id = ?", (time.time(), file_id)
+            )
+        return True
+
+    def finish(
+        self, worker: str, file_id: int, parts: List[dict], metrics: Optional[List[dict]] = None
+    ) -> bool:
+        """
+        Replaces a file's parts with its final ones and marks it done or failed.
+        Returns False, storing nothing, if `worker` no longer holds the file.
+        """
+        errors = [part["Erro"] for part in parts if "Erro" in part]
+        with self._transaction() as conn:
+            if not self._owned(file_id, worker):
+                return False
+            conn.execute("DELETE FROM parts WHERE file_id = ?", (file_id,))
+            conn.executemany(
+                "INSERT INTO parts VALUES (?, ?, ?, ?)",
+                [
+                    (file_id, index, "failed" if "Erro" in part else "done",
+                     json.dumps(part, ensure_ascii=False))
+                    for index, part in enumerate(parts)
+                ],
+            )
+            conn.execute(
+                "UPDATE files SET metrics = ? WHERE id = ?",
+                (json.dumps(metrics) if metrics is not None else None, file_id),
+            )
+            self._set_state(file_id, "failed" if errors else "done", "; ".join(errors) or None)
+        return True
+
+    def save_metrics(self, worker: str, file_id: int, metrics: List[dict]) -> None:
+        """
+        Stores the processing metrics of a batch (see worker.process_claimed) on one of
+        its files, unless the file was claimed again since.
+        """
+        with self._transaction() as conn:
+            if self._owned(file_id, worker, running=False):
+                conn.execute(
+                    "UPDATE files SET metrics = ? WHERE id = ?", (json.dumps(metrics), file_id)
+                )
+
+    def fail(self, worker: str, file_id: int, error: str) -> None:
+        with self._transaction():
+            if self._owned(file_id, worker):
+                self._set_state(file_id, "failed", error)
+
+    def reprocess(self, job_id: str) -> None:
+        """
+        Queues every file of a job again, dropping its stored parts. The files are
+        forced: neither earlier results of the same content nor cached extractions
+        are reused. A worker still running one of them loses its claim (its worker
+        column is cleared), so nothing it stores afterwards mixes with the new run.
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM parts WHERE file_id IN (SELECT id FROM files WHERE job_id = ?)",
+                (job_id,),
+            )
+            conn.execute(
+                "UPDATE files SET state = 'pending', forced = 1, error = NULL, attempts = 0, worker = NULL,"
+                " heartbeat = NULL, metrics = NULL, updated_at = ? WHERE job_id = ?",
+                (time.time(), job_id),
+            )
+
+    def job_status(self, job_id: str) -> Optional[dict]:
+        """
+        Files of a job in upload order, each with its state, error and the parts
+        stored so far, plus per-state counts. None if the job does not exist.
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                return None
+            files = self._conn.execute(
+                "SELECT id, name, sha256, state, error, metrics FROM files"
+                " WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+            parts = self._conn.execute(
+                "SELECT file_id, part FROM parts WHERE file_id IN"
+                " (SELECT id FROM files WHERE job_id = ?) ORDER BY file_id, part_index",
+                (job_id,),
+            ).fetchall()
+
+        parts_by_file: Dict[int, List[dict]] = {}
+        for file_id, part in parts:
+            parts_by_file.setdefault(file_id, []).append(json.loads(part))
+        counts = {state: 0 for state in FILE_STATES}
+        entries = []
+        for file_id, name, digest, state, error, metrics in files:
+            counts[state] += 1
+            entries.append({
+                "id": file_id,
+                "name": name,
+                "sha256": digest,
+                "state": state,
+                "error": error,
+                "parts": parts_by_file.get(file_id, []),
+                "metrics": json.loads(metrics) if metrics else None,
+            })
+        return {
+            "id": job_id,
+            "files": entries,
+            "counts": counts,
+            "finished": counts["pending"] + counts["running"] == 0,
+        }
+
+    def results(self, job_id: str) -> Dict[str, List[dict]]:
+        """Stored parts of a job grouped by file name, like process_documents returns."""
+        status = self.job_status(job_id) or {"files": []}
+        results: Dict[str, List[dict]] = {}
+        for entry in status["files"]:
+            results.setdefault(entry["name"], []).extend(entry["parts"])
+        return results
+
+    def cleanup(self, max_age_days: Optional[float] = JOBS_MAX_AGE_DAYS) -> int:
+        """Deletes jobs older than max_age_days and PDFs no job refers to. Returns jobs removed."""
+        if not max_age_days:
+            return 0
+        with self._transaction() as conn:
+            removed = conn.execute(
+                "DELETE FROM jobs WHERE created_at < ?", (time.time() - max_age_days * 86400,)
+            ).rowcount
+            conn.execute(
+                "DELETE FROM blobs WHERE sha256 NOT IN (SELECT sha256 FROM files)"
+            )
+        return removed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Returns the process-wide job store, opening (and pruning) JOBS_DB on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JobStore(JOBS_DB)
+                _store.cleanup()
+    return _store
@@ -0,0 +1,179 @@
+import json
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+
+class JsonEvent(NamedTuple):
+    """
+    A completed piece of the streamed top-level JSON object.
+
+    kind is "item" for an element of a top-level array field (index is its position),
+    emitted as soon as the element closes, and "field" for a completed top-level field
+    (arrays included, once their closing bracket arrives).
+    """
+
+    kind: str
+    key: str
+    index: Optional[int]
+    value: object
+
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]" + _WHITESPACE
+
+
+class JsonStreamParser:
+    """
+    Incremental parser for a JSON object arriving in text chunks.
+
+    feed() scans each chunk once, character by character, tracking only nesting and
+    string state. Each completed top-level field value, and each element of a
+    top-level array, is decoded with json.loads as soon as it closes. Text is kept as
+    a list of chunks and joined once per value, so long responses are never rebuilt
+    with repeated string concatenation.
+    """
+
+    def __init__(self):
+        self.result = {}
+        self._chunks: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._opaque = False  # Top level is not an object: just collect text
+        self._mode = "key"  # key, value or after (inside the top-level object)
+        self._key = None
+        self._array_items = None  # Items of the top-level array field being read
+        # Current capture: kind ("key", "field" or "item"), nesting depth where it
+        # started, whether it is a bare scalar, text pieces from earlier chunks and
+        # the start offset in the current chunk
+        self._capture = None
+        self._capture_depth = 0
+        self._capture_scalar = False
+        self._capture_parts: List[str] = []
+        self._capture_start = 0
+
+    def feed(self, text: str) -> List[JsonEvent]:
+        """Consumes one chunk and returns the events it completed."""
+        self._chunks.append(text)
+        if self._opaque:
+            return []
+        events = []
+        self._capture_start = 0
+        for i, ch in enumerate(text):
+            if not self._started:
+                if ch in _WHITESPACE:
+                    continue
+                if ch != "{":
+                    self._opaque = True
+                    return []
+                self._started = True
+                self._stack.append(ch)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if (
+                        self._capture
+                        and not self._capture_scalar
+                        and len(self._stack) == self._capture_depth
+                    ):
+                        self._finish(text, i + 1, events)
+                continue
+
+            if self._capture_scalar and ch in _SCALAR_END:
+                self._finish(text, i, events)
+
+            if ch == '"':
+                if self._capture is None:
+                    if len(self._stack) == 1 and self._mode == "key":
+                        self._start("key", i)
+                    elif self._value_starts_here():
+                        self._start(self._value_kind(), i)
+                self._in_string = True
+            elif ch in "{[":
+                if self._capture is None and self._value_starts_here():
+                    if ch == "[" and len(self._stack) == 1:
+                        self._array_items = []
+                    else:
+                        self._start(self._value_kind(), i)
+                self._stack.append(ch)
+            elif ch in "}]":
+                self._stack.pop()
+                depth = len(self._stack)
+                if self._capture and depth == self._capture_depth:
+                    self._finish(text, i + 1, events)
+                elif depth == 1 and self._array_items is not None:
+                    self._emit_field(self._array_items, events)
+                    self._array_items = None
+            elif len(self._stack) == 1 and ch == ":":
+                self._mode = "value"
+            elif len(self._stack) == 1 and ch == ",":
+                self._mode = "key"
+            elif ch not in _WHITESPACE and ch != ",":
+                if self._capture is None and self._value_starts_here():
+                    self._start(self._value_kind(), i)
+                    self._capture_scalar = True
+
+        if self._capture:
+            self._capture_parts.append(text[self._capture_start:])
+        return events
+
+    def close(self) -> dict:
+        """
+        Returns the complete object. Raises json.JSONDecodeError, like json.loads on
+        the whole text would, if the stream was truncated or is not valid JSON.
+        """
+        if self._opaque or self._stack or not self._started:
+            return json.loads("".join(self._chunks))
+        return self.result
+
+    def _value_starts_here(self) -> bool:
+        depth = len(self._stack)
+        if depth == 1:
+            return self._mode == "value"
+        return depth == 2 and self._array_items is not None
+
+    def _value_kind(self) -> str:
+        return "field" if len(self._stack) == 1 else "item"
+
+    def _start(self, kind: str, index: int) -> None:
+        self._capture = kind
+        self._capture_depth = len(self._stack)
+        self._capture_scalar = False
+        self._capture_parts = []
+        self._capture_start = index
+
+    def _finish(self, text: str, end: int, events: List[JsonEvent]) -> None:
+        self._capture_parts.append(text[self._capture_start:end])
+        value = json.loads("".join(self._capture_parts))
+        kind = self._capture
+        self._capture = None
+        self._capture_scalar = False
+        self._capture_parts = []
+
+        if kind == "key":
+            self._key = value
+            self._mode = "after"
+        elif kind == "field":
+            self._emit_field(value, events)
+        else:
+            events.append(JsonEvent("item", self._key, len(self._array_items), value))
+            self._array_items.append(value)
+
+    def _emit_field(self, value, events: List[JsonEvent]) -> None:
+        self.result[self._key] = value
+        self._mode = "after"
+        events.append(JsonEvent("field", self._key, None, value))
+
+
+def iter_json_events(chunks: Iterable[str]) -> Iterator[JsonEvent]:
+    """Yields events from a stream of text chunks, then checks the object is complete."""
+    parser = JsonStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
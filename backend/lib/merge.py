@@ -0,0 +1,124 @@
+"""
+Merges the extractions of overlapping page windows of one document (see
+funcs.page_windows) back into a single extraction.
+"""
+
+import json
+from typing import List, Optional
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _row_key(item) -> str:
+    # Rows read twice at a window overlap should be identical; whitespace may differ
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {key: normalize(child) for key, child in value.items()}
+        if isinstance(value, list):
+            return [normalize(child) for child in value]
+        return value
+
+    return json.dumps(normalize(item), sort_keys=True, ensure_ascii=False)
+
+
+def _same_item(a, b, list_fields: List[str]) -> bool:
+    """
+    True if b continues a: every scalar field present in both is equal, and at least
+    one is. Used for items that carry their own rows (a FDNE table, a BNDES balance
+    date) and may be cut in two by a window edge.
+    """
+    if not isinstance(a, dict) or not isinstance(b, dict):
+        return False
+    shared = [
+        key for key in a
+        if key in b and key not in list_fields and not _is_empty(a[key]) and not _is_empty(b[key])
+    ]
+    return bool(shared) and all(_row_key(a[key]) == _row_key(b[key]) for key in shared)
+
+
+def _merge_lists(first: list, second: list, nested: dict) -> list:
+    """
+    Appends `second` to `first`, dropping the rows at the start of `second` that
+    repeat, in order, the rows at the end of `first` (the window overlap). If the last item
+    of `first` continues in `second`, their nested lists are merged the same way.
+    """
+    if not first:
+        return list(second)
+    if not second:
+        return list(first)
+
+    # Rows read twice are the ones that end `first` and start `second`, in the same
+    # order: the longest such run is dropped. Equal rows elsewhere (the same payment
+    # twice in a day) are kept.
+    first_keys = [_row_key(item) for item in first[-len(second):]]
+    second_keys = [_row_key(item) for item in second[:len(first_keys)]]
+    overlap = next(
+        (size for size in range(len(second_keys), 0, -1)
+         if first_keys[-size:] == second_keys[:size]),
+        0,
+    )
+    second = second[overlap:]
+
+    merged = list(first)
+    if second and nested and _same_item(merged[-1], second[0], list(nested)):
+        merged[-1] = _merge_objects(merged[-1], second[0], nested)
+        second = second[1:]
+    return merged + second
+
+
+def _merge_objects(first: dict, second: dict, list_tree: dict) -> dict:
+    """
+    Field by field: list fields named in list_tree are concatenated with _merge_lists,
+    every other field keeps its first non-empty value.
+    """
+    merged = dict(first)
+    for key, value in second.items():
+        if key in list_tree:
+            merged[key] = _merge_lists(
+                first.get(key) or [], value if isinstance(value, list) else [], list_tree[key]
+            )
+        elif _is_empty(merged.get(key)):
+            merged[key] = value
+    return merged
+
+
+def _list_tree(list_keys: List[str], sep: str = ".") -> dict:
+    # ['tabelas', 'tabelas.Dados'] -> {'tabelas': {'Dados': {}}}
+    tree: dict = {}
+    for key in list_keys:
+        node = tree
+        for name in key.split(sep):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def merge_window_extractions(
+    extractions: List[Optional[dict]], list_keys: List[str]
+) -> Optional[dict]:
+    """
+    Merges extractions of consecutive, overlapping page windows, in window order.
+
+    Header and footer fields (anything that is not a list in list_keys) take the
+    first non-empty value across windows, so they are merged once. Lists named in
+    list_keys ('transacoes', 'saldos', 'tabelas', ...) are concatenated in order,
+    without the rows duplicated at each overlap; an item cut by a window edge (a
+    table, a balance date) is joined with its continuation.
+
+    Args:
+        extractions: One extraction per window, in page order (None for empty windows).
+        list_keys: The LIST_KEYS entry of the document's schema.
+
+    Returns:
+        Optional[dict]: The merged extraction, or None if every window was empty.
+    """
+    tree = _list_tree(list_keys)
+    merged = None
+    for extraction in extractions:
+        if not isinstance(extraction, dict):
+            continue
+        merged = dict(extraction) if merged is None else _merge_objects(merged, extraction, tree)
+    return merged
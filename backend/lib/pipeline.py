@@ -0,0 +1,368 @@
+import contextvars
+import copy
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.config import (
+    BNB_LOCAL_PARSER,
+    CLASSIFIER_PAGES,
+    EXTRACTION_WINDOW_OVERLAP,
+    EXTRACTION_WINDOW_PAGES,
+    HEURISTIC_CLASSIFIER_MIN_CONFIDENCE,
+    INPUT_MODES,
+    MAX_WORKERS,
+    MODEL,
+)
+from backend.lib.bnb_parser import BnbParseError, parse_bnb_statement
+from backend.lib.cache import cached_generate_response
+from backend.lib.funcs import document_fingerprint, first_pages_pdf, iter_split_pdf, page_windows
+from backend.lib.heuristic_classifier import classify_locally
+from backend.lib.instrumentation import span
+from backend.lib.merge import merge_window_extractions
+from backend.prompts import PROMPTS, TEXT_INPUT_NOTE
+from backend.schemas import LIST_KEYS, SCHEMAS
+
+
+def classify_document(document):
+    """
+    Classify a document into one of three categories.
+
+    The local keyword classifier answers first; the AI model is only called when
+    its confidence is below HEURISTIC_CLASSIFIER_MIN_CONFIDENCE, and then only
+    with the first CLASSIFIER_PAGES pages of the document.
+    """
+    with span("classify", bytes=len(document)) as classify_span:
+        source, confidence = classify_locally(document)
+        if source is not None and confidence >= HEURISTIC_CLASSIFIER_MIN_CONFIDENCE:
+            classify_span.set(fast_path=True, source=source)
+            return {"Fonte_documento": source}
+
+        classify_span.set(fast_path=False)
+        prediction = cached_generate_response(
+            MODEL,
+            PROMPTS["classifier"],
+            SCHEMAS["classifier"],
+            first_pages_pdf(document, CLASSIFIER_PAGES),
+        )
+        return prediction
+
+
+def _classify_task(document):
+    """
+    classify_document, plus the fingerprint of documents that are extracted whole
+    (every source but BNB, whose parts are fingerprinted by the split worker).
+    """
+    prediction = classify_document(document)
+    if prediction["Fonte_documento"] == "BNB":
+        return prediction, None
+    return prediction, document_fingerprint(document)
+
+
+def extract_text(document, doc_source, prompt="extractor"):
+    """
+    Extracts a document with the LLM, sent as PDF or as its text layer depending on
+    the source's INPUT_MODES entry.
+    """
+    input_mode = "text" if INPUT_MODES.get(doc_source) == "text" else "pdf"
+    instructions = PROMPTS[prompt] + (TEXT_INPUT_NOTE if input_mode == "text" else "")
+    with span(
+        "extract", source=doc_source, bytes=len(document), prompt=prompt, input_mode=input_mode
+    ):
+        prediction = cached_generate_response(
+            MODEL, instructions, SCHEMAS[doc_source], document, input_mode
+        )
+        return prediction
+
+
+def parse_locally(document, doc_source):
+    """
+    Extraction without the LLM, for sources with a local parser (BNB). Returns None
+    when there is none or its output did not validate.
+    """
+    if doc_source != "BNB" or not BNB_LOCAL_PARSER:
+        return None
+    with span("parse_local", source=doc_source, bytes=len(document)) as parse_span:
+        try:
+            extraction = parse_bnb_statement(document)
+        except BnbParseError as e:
+            parse_span.set(parsed_locally=0, reason=str(e))
+            return None
+        except Exception as e:  # A parser bug must not cost the part: use the LLM
+            print(f"Warning: Local BNB parser failed unexpectedly: {e}")
+            parse_span.set(parsed_locally=0, reason=f"{type(e).__name__}: {e}")
+            return None
+        parse_span.set(parsed_locally=1, rows=len(extraction["transacoes"]))
+        return extraction
+
+
+def extract_or_window(document, doc_source):
+    """
+    Parses the document locally when possible (see parse_locally). Otherwise
+    extracts it in a single call, unless it is longer than
+    EXTRACTION_WINDOW_PAGES pages: then it is not extracted here and its
+    overlapping page windows are returned instead, to be extracted in parallel
+    with extract_text(window, doc_source, "extractor_window") and merged with
+    merge_window_extractions.
+
+    Returns:
+        Tuple[Optional[dict], Optional[List[bytes]], int]: (extraction, None, llm_calls)
+            or (None, windows, len(windows)), where llm_calls is the number of
+            extraction calls the document costs (0 when parsed locally).
+    """
+    extraction = parse_locally(document, doc_source)
+    if extraction is not None:
+        return extraction, None, 0
+    windows = page_windows(document, EXTRACTION_WINDOW_PAGES, EXTRACTION_WINDOW_OVERLAP)
+    if len(windows) == 1:
+        return extract_text(document, doc_source), None, 1
+    return None, windows, len(windows)
+
+
+def _stream_parts(document, id_file, events, slots, cancelled):
+    """
+    Split worker: posts each BNB sub-document, with its fingerprint, to the event
+    queue as soon as it is found. Blocks on `slots` so at most that many parts wait
+    for extraction at once.
+    """
+    num_parts = 0
+    with span("split", bytes=len(document)) as split_span:
+        waited = 0.0  # Time blocked on `slots`, not spent splitting
+        for sub_doc, _ in iter_split_pdf(document):
+            wait_start = time.perf_counter()
+            while not slots.acquire(timeout=0.5):
+                if cancelled.is_set():
+                    return num_parts
+            waited += time.perf_counter() - wait_start
+            data = sub_doc.getvalue()
+            events.put(("part", id_file, num_parts, (data, document_fingerprint(data))))
+            num_parts += 1
+            split_span.set(parts=num_parts, wait_s=waited)
+    return num_parts
+
+
+def process_documents(
+    documents: Iterable[Tuple[str, bytes]],
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    on_result: Optional[Callable[[int, int, dict, dict], None]] = None,
+    on_file: Optional[Callable[[int, List[dict]], None]] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Classifies, splits (for 'BNB') and extracts every document concurrently.
+
+    Classification and extraction calls share a single bounded thread pool, so
+    sub-documents of one file are extracted alongside the other files instead of
+    one after the other. BNB files are split on a separate pool that streams each
+    sub-document to extraction as soon as it is found. Documents longer than
+    EXTRACTION_WINDOW_PAGES are extracted as overlapping page windows on the same
+    pool and merged back into one extraction.
+
+    Parts are deduplicated by their page fingerprints (see
+    funcs.document_fingerprint): a statement that appears in several files, or
+    twice in one export, is extracted once and its result copied to every other
+    occurrence. Each copy is recorded as a "dedup" span with the number of LLM
+    calls it saved.
+
+    A failing classification, split or extraction does not stop the batch: the
+    affected part is returned with "Conteúdo" set to None and the error message
+    under "Erro".
+
+    Args:
+        documents: (file name, PDF bytes) pairs, in the order they should be reported.
+        max_workers: Maximum number of tasks running at once. Defaults to MAX_WORKERS.
+        on_progress: Optional callback called as on_progress(files_done, files_total)
+                     from the calling thread every time a file is fully processed.
+        on_result: Optional callback called as on_result(id_file, id_part, part, status)
+                   from the calling thread as soon as each part is finished (or has
+                   failed). status holds the running "done", "failed" and "in_flight"
+                   counts.
+        on_file: Optional callback called as on_file(id_file, parts) from the calling
+                 thread once every part of a file is finished, with its final parts.
+
+    Returns:
+        Dict[str, List[dict]]: Results grouped by file name, in input order, each
+                               file's parts in page order.
+    """
+    documents = list(documents)
+    num_files = len(documents)
+    max_workers = max_workers or MAX_WORKERS
+    parts: List[list] = [[] for _ in documents]  # Result slots per file, in part order
+    sources: List[Optional[str]] = [None] * num_files
+    remaining = [1] * num_files  # Outstanding tasks per file
+    # (id_file, id_part) -> [window extractions, windows still running, first error]
+    windowed: Dict[Tuple[int, int], list] = {}
+    # (source, fingerprint) of the parts being extracted, keyed by (id_file, id_part)
+    owned: Dict[Tuple[int, int], Tuple[str, str]] = {}
+    # (source, fingerprint) -> copies waiting for the part being extracted
+    duplicates: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+    # (source, fingerprint) -> (id_file, id_part, llm_calls) of extracted parts
+    extracted: Dict[Tuple[str, str], Tuple[int, int, int]] = {}
+    llm_calls: Dict[Tuple[int, int], int] = {}
+    files_done = 0
+    status = {"done": 0, "failed": 0, "in_flight": 0}
+
+    events = queue.Queue()
+    slots = threading.BoundedSemaphore(max_workers)  # Split parts awaiting extraction
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    split_executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(pool, stage, id_file, id_part, fn, *args):
+        status["in_flight"] += 1
+        # Run in a copy of the caller's context so spans land in its metrics run
+        future = pool.submit(contextvars.copy_context().run, fn, *args)
+        future.add_done_callback(
+            lambda done: events.put((stage, id_file, id_part, done))
+        )
+
+    def report(id_file, id_part, error=None):
+        part = parts[id_file][id_part]
+        if error is not None:
+            part["Erro"] = str(error)
+            status["failed"] += 1
+        else:
+            status["done"] += 1
+        if on_result:
+            on_result(id_file, id_part, part, dict(status))
+
+    def task_done(id_file):
+        nonlocal files_done
+        remaining[id_file] -= 1
+        if remaining[id_file] == 0:
+            files_done += 1
+            if on_file:
+                on_file(id_file, parts[id_file])
+            if on_progress:
+                on_progress(files_done, num_files)
+
+    def copy_result(key, id_file, id_part):
+        """Fills a duplicate part from the extraction of its original."""
+        id_original_file, id_original_part, calls = extracted[key]
+        original = parts[id_original_file][id_original_part]
+        parts[id_file][id_part]["Conteúdo"] = copy.deepcopy(original["Conteúdo"])
+        with span("dedup", source=key[0]) as dedup_span:
+            dedup_span.set(parts_deduplicated=1, llm_calls_saved=calls)
+        report(id_file, id_part, original.get("Erro"))
+        task_done(id_file)
+
+    def extract_once(stage, id_file, id_part, document, fingerprint):
+        """Submits a part for extraction, unless the same part already is (or was)."""
+        key = (sources[id_file], fingerprint)
+        if key in extracted:
+            copy_result(key, id_file, id_part)
+        elif key in duplicates:
+            duplicates[key].append((id_file, id_part))
+        else:
+            owned[id_file, id_part] = key
+            duplicates[key] = []
+            submit(
+                executor, stage, id_file, id_part,
+                extract_or_window, document, sources[id_file],
+            )
+            return True
+        return False
+
+    def finish_part(id_file, id_part, error=None):
+        """Reports an extracted part, then every duplicate that was waiting for it."""
+        report(id_file, id_part, error)
+        key = owned.pop((id_file, id_part), None)
+        if key is not None:
+            extracted[key] = (id_file, id_part, llm_calls.pop((id_file, id_part), 0))
+            for id_duplicate_file, id_duplicate_part in duplicates.pop(key):
+                copy_result(key, id_duplicate_file, id_duplicate_part)
+
+    try:
+        for id_file, (_, data) in enumerate(documents):
+            submit(executor, "classify", id_file, None, _classify_task, data)
+
+        while status["in_flight"]:
+            stage, id_file, id_part, payload = events.get()
+
+            if stage == "part":
+                # A sub-document streamed by a split worker
+                parts[id_file].append(
+                    {"Fonte": sources[id_file], "Conteúdo": None, "Parte": f"{id_part + 1}"}
+                )
+                remaining[id_file] += 1
+                if not extract_once("extract_part", id_file, id_part, *payload):
+                    slots.release()  # Nothing to extract for a duplicate
+                continue
+
+            status["in_flight"] -= 1
+            if stage == "extract_part":
+                slots.release()
+            error = payload.exception()
+            data = documents[id_file][1]
+
+            if stage == "classify":
+                if error is not None:
+                    parts[id_file] = [{"Fonte": None, "Conteúdo": None}]
+                    report(id_file, 0, error)
+                else:
+                    prediction, fingerprint = payload.result()
+                    source = sources[id_file] = prediction["Fonte_documento"]
+                    if source == "BNB":
+                        # Split the document into multiple sub-documents
+                        submit(
+                            split_executor, "split", id_file, None,
+                            _stream_parts, data, id_file, events, slots, cancelled,
+                        )
+                    else:
+                        parts[id_file] = [{"Fonte": source, "Conteúdo": None}]
+                        extract_once("extract", id_file, 0, data, fingerprint)
+                    continue
+
+            elif stage == "split":
+                if error is not None:
+                    parts[id_file].append({"Fonte": sources[id_file], "Conteúdo": None})
+                    report(id_file, len(parts[id_file]) - 1, error)
+                num_parts = len(parts[id_file])
+                for id_subdoc, part in enumerate(parts[id_file]):
+                    part["Parte"] = f"{id_subdoc + 1} de {num_parts}"
+            elif stage == "window":
+                (id_part, id_window) = id_part
+                state = windowed[id_file, id_part]
+                if error is None:
+                    state[0][id_window] = payload.result()
+                elif state[2] is None:
+                    state[2] = error
+                state[1] -= 1
+                if state[1]:
+                    continue
+                del windowed[id_file, id_part]
+                if state[2] is None:
+                    parts[id_file][id_part]["Conteúdo"] = merge_window_extractions(
+                        state[0], LIST_KEYS[sources[id_file]]
+                    )
+                finish_part(id_file, id_part, state[2])
+            else:
+                if error is None:
+                    extraction, windows, llm_calls[id_file, id_part] = payload.result()
+                    if windows:
+                        # Too long for one call: extract the windows alongside everything else
+                        windowed[id_file, id_part] = [[None] * len(windows), len(windows), None]
+                        for id_window, window in enumerate(windows):
+                            submit(
+                                executor, "window", id_file, (id_part, id_window),
+                                extract_text, window, sources[id_file], "extractor_window",
+                            )
+                        continue
+                    parts[id_file][id_part]["Conteúdo"] = extraction
+                finish_part(id_file, id_part, error)
+
+            task_done(id_file)
+    except BaseException:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        split_executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    split_executor.shutdown()
+
+    processed_results: Dict[str, List[dict]] = {}
+    for (name, _), file_parts in zip(documents, parts):
+        processed_results.setdefault(name, []).extend(file_parts)
+    return processed_results
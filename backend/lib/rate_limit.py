@@ -0,0 +1,287 @@
+"""
+Client-side rate limiting for Vertex AI calls.
+
+One RateLimiter per process is shared by every caller of the Gemini connector. It
+combines:
+
+- token buckets for the requests-per-minute and tokens-per-minute budgets, kept in
+  a SQLite file (RATE_LIMIT_DB) so the processes of the CLI and the job workers
+  draw from one budget instead of each spending all of it;
+- an AIMD concurrency limit: each throttled call halves the number of calls allowed
+  in flight, each successful one grows it back by about one per round of calls;
+- jittered exponential backoff (backoff_delay) between retries of throttled or
+  transiently failing calls (429 / RESOURCE_EXHAUSTED and 5xx).
+"""
+
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from backend.config import (
+    MAX_WORKERS,
+    RATE_LIMIT_DB,
+    RATE_LIMIT_MIN_CONCURRENCY,
+    REQUESTS_PER_MINUTE,
+    TOKENS_PER_MINUTE,
+)
+
+# Backoff before retry n is uniform in [0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2**n)]
+BACKOFF_BASE_S = 1.0
+BACKOFF_CAP_S = 60.0
+
+RETRYABLE_STATUSES = {"RESOURCE_EXHAUSTED", "UNAVAILABLE", "INTERNAL", "DEADLINE_EXCEEDED"}
+
+# Vertex AI bills each PDF page as a fixed number of input tokens
+TOKENS_PER_PDF_PAGE = 258
+PAGE_PATTERN = re.compile(rb"/Type\s*/Page(?!s)")
+
+
+def error_code(error: BaseException) -> Optional[int]:
+    """HTTP status code of an API error (google.genai.errors.APIError has .code), if any."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    return None
+
+
+def is_throttled(error: BaseException) -> bool:
+    return error_code(error) == 429 or getattr(error, "status", None) == "RESOURCE_EXHAUSTED"
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for quota errors and transient server-side failures."""
+    code = error_code(error)
+    if code is not None and (code == 429 or code >= 500):
+        return True
+    return getattr(error, "status", None) in RETRYABLE_STATUSES
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry number (0 for the first)."""
+    return random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt))
+
+
+def estimate_tokens(prompt: str, document) -> int:
+    """
+    Rough input token count of one call, used to reserve TPM budget before sending it.
+    document is a PDF or a text-layer payload (list of text and PDF parts).
+    """
+    tokens = len(prompt) // 4
+    for part in [document] if isinstance(document, bytes) else document:
+        if isinstance(part, str):
+            # Layout text is mostly alignment blanks, which tokenize in long runs
+            tokens += len(" ".join(part.split())) // 4
+        else:
+            tokens += (len(PAGE_PATTERN.findall(part)) or 1) * TOKENS_PER_PDF_PAGE
+    return tokens
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute` units per minute up to a burst of `capacity` units.
+    A rate of 0 (or less) disables the bucket.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @contextmanager
+    def _current(self):
+        """Holds the bucket, with its level refilled up to now, while self.level is updated."""
+        with self._lock:
+            self._refill()
+            yield
+
+    def wait_time(self, amount: float) -> float:
+        """Takes `amount` units if available and returns 0, else returns seconds to wait."""
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)  # A single huge call must still get through
+        with self._current():
+            if self.level >= amount:
+                self.level -= amount
+                return 0.0
+            return (amount - self.level) / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """Debits (or refunds, if negative) units after the fact, e.g. actual vs estimated tokens."""
+        if self.rate <= 0:
+            return
+        with self._current():
+            self.level = min(self.capacity, self.level - amount)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose level is stored in a SQLite database under `name`, so every
+    process using the same file draws from the same budget. Each operation reads,
+    refills and writes back the level in one transaction.
+    """
+
+    def __init__(self, path: str, name: str, per_minute: float, capacity: Optional[float] = None):
+        super().__init__(per_minute, capacity)
+        self.name = name
+        self._conn = None
+        if self.rate <= 0:
+            return  # Disabled: never touches the database
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets"
+            " (name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    @contextmanager
+    def _current(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT level, updated FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                # Wall-clock time, since the level is shared between processes
+                now = time.time()
+                if row is None:
+                    self.level = self.capacity
+                else:
+                    elapsed = max(0.0, now - row[1])
+                    self.level = min(self.capacity, row[0] + elapsed * self.rate)
+                yield
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (self.name, self.level, now)
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+
+class RateLimiter:
+    """
+    Shared RPM/TPM budgets plus an AIMD limit on calls in flight. With budget_db,
+    the budgets are shared with every process using that database (see
+    SharedTokenBucket); the concurrency limit is always per process.
+
+    Callers wrap each attempt in ticket = acquire() / release(ticket, ...); release()
+    reports whether the call was throttled, which drives the concurrency limit down or up.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        budget_db: str = "",
+    ):
+        if budget_db:
+            self.requests = SharedTokenBucket(budget_db, "requests", requests_per_minute)
+            self.tokens = SharedTokenBucket(budget_db, "tokens", tokens_per_minute)
+        else:
+            self.requests = TokenBucket(requests_per_minute)
+            self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+        # Bumped on every decrease: calls sent before it were sent under the old limit
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int = 0) -> int:
+        """
+        Blocks until a concurrency slot and the request/token budget are available.
+        Returns a ticket to pass to release().
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            ticket = self._generation
+        try:
+            for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                while True:
+                    delay = bucket.wait_time(amount)
+                    if delay <= 0:
+                        break
+                    time.sleep(delay)
+        except BaseException:
+            self.release(ticket)
+            raise
+        return ticket
+
+    def release(self, ticket: int, throttled: bool = False, token_correction: int = 0) -> None:
+        """
+        Frees the slot taken by acquire(). throttled=True halves the concurrency limit,
+        once per round: throttled calls that were sent before the last decrease do not
+        decrease it again. Otherwise the limit grows by 1/limit. token_correction is
+        added to the tokens spent (actual minus estimated).
+        """
+        if token_correction:
+            self.tokens.adjust(token_correction)
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if ticket == self._generation:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self._generation += 1
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+            }
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """Returns the process-wide limiter, configured from backend.config on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    requests_per_minute=REQUESTS_PER_MINUTE,
+                    tokens_per_minute=TOKENS_PER_MINUTE,
+                    max_concurrency=MAX_WORKERS,
+                    min_concurrency=RATE_LIMIT_MIN_CONCURRENCY,
+                    budget_db=RATE_LIMIT_DB,
+                )
+    return _limiter
+
+
+def set_limiter(limiter: Optional[RateLimiter]) -> None:
+    """Replaces the process-wide limiter (None rebuilds it from the settings on next use)."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
@@ -0,0 +1,98 @@
+"""
+Text-layer payloads for the "text" input mode (see INPUT_MODES in config.py).
+
+Instead of the PDF, the extractor receives each page's layout-preserving text, read
+once with pypdf. Pages without a usable text layer (scans, images of tables) are
+kept as PDF, so a payload is a list of parts in page order: text (str) for runs of
+pages with text and a PDF (bytes) of each run of image-only pages.
+"""
+
+import io
+from typing import List, Union
+
+import pypdf
+
+from backend.config import TEXT_LAYER_MIN_CHARS
+from backend.lib.instrumentation import span
+
+Payload = List[Union[str, bytes]]
+
+
+def page_header(number: int, total: int) -> str:
+    return f"=== Página {number} de {total} ==="
+
+
+def page_text(page: pypdf.PageObject) -> str:
+    """Layout-mode text of a page without trailing blanks, or "" if it has none."""
+    try:
+        text = page.extract_text(extraction_mode="layout") or ""
+    except Exception:  # e.g. a page without a content stream
+        return ""
+    return "\n".join(line.rstrip() for line in text.splitlines()).strip("\n")
+
+
+def _pages_pdf(reader: pypdf.PdfReader, indexes: List[int]) -> bytes:
+    writer = pypdf.PdfWriter()
+    for index in indexes:
+        writer.add_page(reader.pages[index])
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def text_payload(pdf_bytes: bytes, min_chars: int = TEXT_LAYER_MIN_CHARS) -> Payload:
+    """
+    Payload parts of a PDF for the text input mode.
+
+    Args:
+        pdf_bytes: The PDF document.
+        min_chars: Pages with fewer non-blank characters of text are sent as PDF.
+
+    Returns:
+        Payload: Text and PDF parts in page order. [pdf_bytes] when the PDF cannot
+                 be read or no page has a text layer.
+    """
+    with span("text_layer", bytes=len(pdf_bytes)) as text_span:
+        try:
+            reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+            texts = [page_text(page) for page in reader.pages]
+        except Exception as e:
+            print(f"Warning: Could not read the text layer, sending the PDF: {e}")
+            text_span.set(text_pages=0, pdf_pages=0)
+            return [pdf_bytes]
+
+        total = len(texts)
+        has_text = [len("".join(text.split())) >= min_chars for text in texts]
+        text_span.set(pages=total, text_pages=sum(has_text), pdf_pages=total - sum(has_text))
+        if not any(has_text):
+            return [pdf_bytes]
+
+        parts: Payload = []
+        run: List[int] = []  # Consecutive pages of the same kind
+        for index in range(total + 1):
+            if run and (index == total or has_text[index] != has_text[run[0]]):
+                if has_text[run[0]]:
+                    parts.append("\n".join(
+                        f"{page_header(page + 1, total)}\n{texts[page]}" for page in run
+                    ))
+                else:
+                    parts.append(_pages_pdf(reader, run))
+                run = []
+            run.append(index)
+        return parts
+
+
+def payload_size(payload: Union[bytes, Payload]) -> int:
+    """Bytes sent for a payload: the PDF bytes plus the UTF-8 size of the text parts."""
+    if isinstance(payload, bytes):
+        return len(payload)
+    return sum(len(part.encode("utf-8")) if isinstance(part, str) else len(part) for part in payload)
+
+
+def input_mode(payload: Union[bytes, Payload]) -> str:
+    """'pdf', 'text' or, for text with image-only pages attached as PDF, 'text+pdf'."""
+    if isinstance(payload, bytes) or all(isinstance(part, bytes) for part in payload):
+        return "pdf"
+    if all(isinstance(part, str) for part in payload):
+        return "text"
+    return "text+pdf"
@@ -1,7 +1,8 @@
 from .classifier import CLASSIFIER_PROMPT
-from .extractor import EXTRACTOR_PROMPT
+from .extractor import EXTRACTOR_PROMPT, EXTRACTOR_WINDOW_PROMPT, TEXT_INPUT_NOTE
 
 PROMPTS = {
     "classifier": CLASSIFIER_PROMPT,
     "extractor": EXTRACTOR_PROMPT,
+    "extractor_window": EXTRACTOR_WINDOW_PROMPT,
 }
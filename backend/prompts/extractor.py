@@ -5,3 +5,10 @@ EXTRACTOR_PROMPT = """You are a PDF data extractor. Your task is to accurately e
 - The values must only include text found in the document
 - Do not normalize any entity value.
 - If an entity is not found in the document, set the entity value to null."""
+
+EXTRACTOR_WINDOW_PROMPT = EXTRACTOR_PROMPT + """
+- The pages provided may be an excerpt of a longer document. Extract every row shown in these pages, in the order they appear, and set fields that do not appear in these pages to null."""
+
+# Appended to the extractor prompts when the document is sent as its text layer
+TEXT_INPUT_NOTE = """
+- The document is given as the text layer of the PDF, with the page layout preserved (columns are aligned with spaces). Each page starts with a line like "=== Página 1 de 3 ===". Pages without a text layer are attached as PDF in their place."""
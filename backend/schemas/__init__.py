@@ -15,3 +15,80 @@ LIST_KEYS = {
     "BNB": ["transacoes"],
     "FDNE": ["tabelas", "tabelas.Dados"],
 }
+
+# Types of the flattened columns (see backend/lib/flatten.py), used by
+# backend/lib/field_types.py to turn the extracted strings into typed columns:
+# "amount" (Brazilian format, e.g. "1.234,56") becomes integer cents, "date"
+# (DD/MM/YYYY) becomes datetime64 and "category" a pandas categorical.
+# Columns not listed stay strings.
+FIELD_TYPES = {
+    "BNB": {
+        "amount": [
+            "dados_operacao.valor_da_operacao",
+            *(f"saldo_inicial.saldo_{kind}" for kind in ("normal", "atraso", "prejuizo")),
+            *(
+                f"{prefix}.{field}_{kind}"
+                for prefix in ("transacoes", "saldo_final.principal", "saldo_final.jus_bas_var")
+                for field in ("valor", "saldo")
+                for kind in ("normal", "atraso", "prejuizo")
+            ),
+            *(
+                f"totais.{total}.valor_{kind}"
+                for total in ("total_cliente_operacao", "total_cliente_ficha")
+                for kind in ("normal", "atraso", "prejuizo")
+            ),
+            "totais.total_geral_pago",
+        ],
+        "date": [
+            "report_datetime.data",
+            "dados_operacao.periodo.data_inicio",
+            "dados_operacao.periodo.data_fim",
+            "dados_operacao.data_do_contrato",
+            "dados_operacao.vencimento_final",
+            "transacoes.data_lancamento",
+            "transacoes.data_valorizacao",
+        ],
+        "category": [
+            "nome_banco",
+            "titulo_documento",
+            "agencia",
+            "info_cliente.nome",
+            "dados_operacao.area_de_credito",
+            "dados_operacao.codigo_da_operacao",
+            "dados_operacao.moeda_da_operacao",
+            "dados_operacao.moeda_indexadora",
+            "dados_operacao.programa",
+            "transacoes.d/c",
+            "transacoes.historico",
+            "banco_emissor",
+        ],
+    },
+    "BNDES": {
+        "amount": ["saldos.items.valor"],
+        "date": ["data_emissao", "detalhes.data_contratacao", "saldos.data"],
+        "category": [
+            "razao_social",
+            "cnpj",
+            "subcredito_financeiro",
+            "sistema",
+            "unidade_monetaria",
+            "identificador",
+            "saldos.items.saldo",
+        ],
+    },
+    "FDNE": {
+        "amount": [
+            "tabelas.Dados.SALDO CAPITALIZADO",
+            "tabelas.Dados.JUROS",
+            "tabelas.Dados.SALDO DEVEDOR",
+            "tabelas.Total",
+        ],
+        "date": ["tabelas.DataReferencia"],
+        "category": [
+            "tabelas.Empresa",
+            "tabelas.CNPJ",
+            "tabelas.Dados.LINHA",
+            "tabelas.Dados.OPERAÇÃO Nº",
+        ],
+    },
+}
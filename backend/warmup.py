@@ -0,0 +1,58 @@
+"""
+Warm-up run when the web server or a job worker starts (LOAN_READER_WARM_UP).
+
+The modules behind a request are imported lazily, so nothing heavy is loaded while
+the app starts or a page script re-runs. Warming up loads them ahead of the first
+request instead, off the request path: pandas and the compiled flatteners for the
+results page, and in the workers also the pipeline, the Gemini SDK and the client.
+"""
+
+import time
+from typing import Dict
+
+
+def warm_up(pipeline: bool = True, client: bool = True) -> Dict[str, float]:
+    """
+    Loads what the first request would otherwise load. Failures are only printed:
+    the request then pays for that step as it would without warm-up.
+
+    Args:
+        pipeline: Also import the pipeline (job workers).
+        client: Also create the Gemini client, loading the SDK and credentials (job workers).
+
+    Returns:
+        Dict[str, float]: Seconds spent on each step.
+    """
+    timings = {}
+
+    def step(name, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            print(f"Warning: Warm-up step '{name}' failed: {e}")
+        timings[name] = time.perf_counter() - start
+
+    def schemas():
+        import pandas  # noqa: F401
+
+        from backend.lib.flatten import get_flattener
+        from backend.schemas import LIST_KEYS
+
+        for source in LIST_KEYS:
+            get_flattener(source)
+
+    def pipeline_modules():
+        import backend.lib.pipeline  # noqa: F401
+
+    def gemini_client():
+        from backend.connectors.gemini_connector import get_client
+
+        get_client()
+
+    step("schemas", schemas)
+    if pipeline:
+        step("pipeline", pipeline_modules)
+    if client:
+        step("client", gemini_client)
+    return timings
@@ -0,0 +1,152 @@
+"""
+Job queue workers: claim batches of pending files from the job store and process them.
+
+The web app starts LOAN_READER_JOB_WORKERS of them itself; to run them separately
+(e.g. on another machine sharing the database, with LOAN_READER_JOB_WORKERS=0 for
+the web app):
+
+    python -m backend.worker --workers 4
+"""
+
+import argparse
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
+
+from backend.config import JOB_LEASE_SECONDS, JOB_WORKERS, JOBS_DB, LOG_LEVEL, WARM_UP
+
+# Seconds an idle worker waits before looking for pending files again
+POLL_INTERVAL = 1.0
+
+
+def process_claimed(store, worker: str, claimed: List[Tuple[int, str, bytes, bool]]) -> None:
+    """
+    Runs the pipeline once on a batch of claimed files (see JobStore.claim_batch), so
+    they are processed concurrently and a statement found in several of them is
+    extracted once. Each part is stored as soon as it finishes and each file as soon
+    as all its parts have; the batch's metrics are stored with its first file.
+    Files the worker lost its claim on (reprocessed meanwhile) are no longer written.
+    Forced (reprocessed) batches bypass the extraction cache.
+    """
+    from backend.lib.cache import refreshing_cache
+    from backend.lib.instrumentation import metrics_run
+    from backend.lib.pipeline import process_documents
+
+    file_ids = [file_id for file_id, _, _, _ in claimed]
+    forced = claimed[0][3]
+    running = set(file_ids)
+
+    def finish_file(id_file, parts):
+        store.finish(worker, file_ids[id_file], parts)
+        running.discard(file_ids[id_file])
+
+    # Keeps the claims alive while a long part is being extracted
+    stop = threading.Event()
+
+    def keep_alive():
+        while not stop.wait(JOB_LEASE_SECONDS / 3):
+            store.heartbeat(worker, list(running))
+
+    beat = threading.Thread(target=keep_alive, daemon=True)
+    beat.start()
+    name = claimed[0][1] if len(claimed) == 1 else f"{len(claimed)} arquivos"
+    try:
+        with metrics_run(name) as run, (refreshing_cache() if forced else nullcontext()):
+            process_documents(
+                [(file_name, data) for _, file_name, data, _ in claimed],
+                on_result=lambda id_file, id_part, part, status: store.save_part(
+                    worker, file_ids[id_file], id_part, part
+                ),
+                on_file=finish_file,
+            )
+        store.save_metrics(worker, file_ids[0], run.summary())
+    except Exception as e:
+        for file_id in list(running):
+            store.fail(worker, file_id, str(e))
+    finally:
+        stop.set()
+
+
+def run_worker(
+    db_path: str = JOBS_DB, stop: Optional[threading.Event] = None, log_level: str = LOG_LEVEL
+) -> None:
+    """Claims and processes files until `stop` is set (forever if it is None)."""
+    from backend.lib.instrumentation import configure_logging
+    from backend.lib.jobs import JobStore, new_worker_id
+
+    configure_logging(log_level)
+    store = JobStore(db_path)
+    worker = new_worker_id()
+    parent = os.getppid()
+    if WARM_UP:
+        from backend.warmup import warm_up
+
+        warm_up()
+    while stop is None or not stop.is_set():
+        if os.getppid() != parent:
+            return  # The process that started this worker is gone
+        claimed = store.claim_batch(worker)
+        if not claimed:
+            time.sleep(POLL_INTERVAL)
+            continue
+        process_claimed(store, worker, claimed)
+
+
+def start_workers(
+    count: int = JOB_WORKERS, db_path: str = JOBS_DB, log_level: str = LOG_LEVEL
+) -> List[multiprocessing.Process]:
+    """
+    Starts `count` worker processes, which stop with the calling process.
+    Spawned rather than forked, since the caller (e.g. the Streamlit server) runs threads.
+
+    They are not daemon processes, so they can start the page-reading processes of a
+    parallel split (LOAN_READER_SPLIT_WORKERS); instead they are terminated at exit,
+    and stop on their own if the calling process dies without running its exit handlers.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for _ in range(count):
+        process = context.Process(
+            target=run_worker, args=(db_path, None, log_level), daemon=False
+        )
+        process.start()
+        processes.append(process)
+    atexit.register(_terminate, processes)
+    return processes
+
+
+def _terminate(processes: List[multiprocessing.Process]) -> None:
+    # Runs before multiprocessing's own exit handler, which would wait for them forever
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.worker", description="Job queue worker processes."
+    )
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1))
+    parser.add_argument("--db", default=JOBS_DB, help="Job store database")
+    parser.add_argument(
+        "--log-level", default=LOG_LEVEL, help="Level of the loan_reader loggers (INFO logs every span)"
+    )
+    args = parser.parse_args(argv)
+
+    processes = start_workers(args.workers, args.db, args.log_level)
+    print(f"{len(processes)} worker(s) processing jobs from '{args.db}'.")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
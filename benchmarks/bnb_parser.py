@@ -0,0 +1,133 @@
+"""
+Compares the local BNB text-layer parser against LLM extraction, field by field.
+
+Each input is split like the pipeline does; every part is parsed locally and
+extracted by the LLM (through the extraction cache, so reruns are free), and the two
+results are compared on every scalar field and every transaction row. Needs the same
+credentials as the app, unless --synthetic is used (local parser only).
+
+Usage:
+    python -m benchmarks.bnb_parser statements/bnb/*.pdf --report report.json
+    python -m benchmarks.bnb_parser --synthetic 20
+"""
+
+import argparse
+import glob
+import json
+import time
+from pathlib import Path
+
+from backend.config import MODEL
+from backend.lib.bnb_parser import BnbParseError, ROW_FIELDS, parse_bnb_statement
+from backend.lib.funcs import flatten_json, iter_split_pdf
+from benchmarks.synthetic import make_bnb_statement_pdf
+
+ROW_KEYS = ["data_lancamento", "data_valorizacao", "d/c", "historico", *ROW_FIELDS]
+
+
+def _norm(value):
+    return None if value in (None, "") else " ".join(str(value).split())
+
+
+def compare(local: dict, llm: dict) -> dict:
+    """Field-level agreement between a local parse and an LLM extraction of the same part."""
+    local_fields = flatten_json({k: v for k, v in local.items() if k != "transacoes"})
+    llm_fields = flatten_json({k: v for k, v in (llm or {}).items() if k != "transacoes"})
+    fields = sorted(set(local_fields) | set(llm_fields))
+    field_mismatches = {
+        name: {"local": local_fields.get(name), "llm": llm_fields.get(name)}
+        for name in fields
+        if _norm(local_fields.get(name)) != _norm(llm_fields.get(name))
+    }
+
+    local_rows = local.get("transacoes") or []
+    llm_rows = (llm or {}).get("transacoes") or []
+    row_mismatches = []
+    for index in range(max(len(local_rows), len(llm_rows))):
+        a = local_rows[index] if index < len(local_rows) else {}
+        b = llm_rows[index] if index < len(llm_rows) else {}
+        diff = {key: [a.get(key), b.get(key)] for key in ROW_KEYS if _norm(a.get(key)) != _norm(b.get(key))}
+        if diff:
+            row_mismatches.append({"row": index, "diff": diff})
+    return {
+        "fields": len(fields),
+        "field_mismatches": field_mismatches,
+        "rows_local": len(local_rows),
+        "rows_llm": len(llm_rows),
+        "row_mismatches": row_mismatches,
+    }
+
+
+def run_part(name: str, document: bytes, use_llm: bool) -> dict:
+    entry = {"part": name, "pages_bytes": len(document)}
+    start = time.perf_counter()
+    try:
+        local = parse_bnb_statement(document)
+        entry["parsed"] = True
+    except BnbParseError as e:
+        local = None
+        entry.update(parsed=False, reason=str(e))
+    entry["local_s"] = time.perf_counter() - start
+
+    if use_llm:
+        # Imported here so --synthetic runs without Vertex AI credentials
+        from backend.lib.cache import cached_generate_response
+        from backend.prompts import PROMPTS
+        from backend.schemas import SCHEMAS
+
+        start = time.perf_counter()
+        llm = cached_generate_response(MODEL, PROMPTS["extractor"], SCHEMAS["BNB"], document)
+        entry["llm_s"] = time.perf_counter() - start
+        if local is not None:
+            entry["comparison"] = compare(local, llm)
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="*", help="BNB PDF files or glob patterns")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Also parse this many synthetic statements (no LLM calls)")
+    parser.add_argument("--pages", type=int, default=3, help="Pages per synthetic statement")
+    parser.add_argument("--report", help="Write every part's result and differences to this JSON file")
+    args = parser.parse_args()
+
+    entries = []
+    for path in sorted({p for pattern in args.inputs for p in glob.glob(pattern)}):
+        for index, (sub_doc, _) in enumerate(iter_split_pdf(Path(path).read_bytes()), start=1):
+            entries.append(run_part(f"{Path(path).name}#{index}", sub_doc.getvalue(), use_llm=True))
+    for index in range(args.synthetic):
+        document = make_bnb_statement_pdf(args.pages, seed=index)
+        entries.append(run_part(f"synthetic#{index + 1}", document, use_llm=False))
+    if not entries:
+        parser.error("no input PDFs and no --synthetic statements")
+
+    parsed = [entry for entry in entries if entry["parsed"]]
+    compared = [entry for entry in parsed if "comparison" in entry]
+    print(f"parts: {len(entries)}, parsed locally: {len(parsed)} "
+          f"({len(parsed) / len(entries):.0%}), falling back to the LLM: {len(entries) - len(parsed)}")
+    print(f"local parse: {1000 * sum(e['local_s'] for e in entries) / len(entries):.1f} ms/part")
+    llm_times = [entry["llm_s"] for entry in entries if "llm_s" in entry]
+    if llm_times:
+        print(f"LLM extraction: {sum(llm_times) / len(llm_times):.2f} s/part (cache hits included)")
+    if compared:
+        fields = sum(e["comparison"]["fields"] for e in compared)
+        field_diffs = sum(len(e["comparison"]["field_mismatches"]) for e in compared)
+        rows = sum(max(e["comparison"]["rows_local"], e["comparison"]["rows_llm"]) for e in compared)
+        row_diffs = sum(len(e["comparison"]["row_mismatches"]) for e in compared)
+        print(f"fields agreeing with the LLM: {fields - field_diffs}/{fields}, "
+              f"rows agreeing: {rows - row_diffs}/{rows}")
+    reasons = {}
+    for entry in entries:
+        if not entry["parsed"]:
+            reasons[entry["reason"]] = reasons.get(entry["reason"], 0) + 1
+    for reason, count in sorted(reasons.items(), key=lambda item: -item[1])[:10]:
+        print(f"  fallback x{count}: {reason}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Wrote '{args.report}'")
+
+
+if __name__ == "__main__":
+    main()
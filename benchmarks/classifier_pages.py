@@ -0,0 +1,77 @@
+"""
+Compares LLM classification of full documents against first-N-page documents.
+
+Calls Vertex AI for real (no cache), so it needs the same credentials as the app.
+
+Usage:
+    python -m benchmarks.classifier_pages statements/*.pdf --pages 1 --repeat 3
+"""
+
+import argparse
+import glob
+import json
+import statistics
+import time
+from pathlib import Path
+
+from backend.config import MODEL
+from backend.connectors.gemini_connector import (
+    _build_request,
+    generate_response,
+    get_client,
+)
+from backend.lib.funcs import first_pages_pdf
+from backend.prompts import PROMPTS
+from backend.schemas import SCHEMAS
+
+
+def count_input_tokens(document: bytes) -> int:
+    contents, _ = _build_request(PROMPTS["classifier"], SCHEMAS["classifier"], document)
+    return get_client().models.count_tokens(model=MODEL, contents=contents).total_tokens
+
+
+def time_classification(document: bytes, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generate_response(MODEL, PROMPTS["classifier"], SCHEMAS["classifier"], document)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="+", help="PDF files or glob patterns")
+    parser.add_argument("--pages", type=int, default=1, help="Pages kept in trimmed mode")
+    parser.add_argument("--repeat", type=int, default=3, help="Calls per file and mode")
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.inputs for p in glob.glob(pattern)})
+    rows = []
+    for path in paths:
+        full = Path(path).read_bytes()
+        trimmed = first_pages_pdf(full, args.pages)
+        for mode, document in (("full", full), (f"first_{args.pages}", trimmed)):
+            timings = time_classification(document, args.repeat)
+            rows.append(
+                {
+                    "file": Path(path).name,
+                    "mode": mode,
+                    "bytes": len(document),
+                    "input_tokens": count_input_tokens(document),
+                    "latency_median_s": round(statistics.median(timings), 3),
+                    "latency_min_s": round(min(timings), 3),
+                }
+            )
+            print(json.dumps(rows[-1], ensure_ascii=False))
+
+    for mode in sorted({row["mode"] for row in rows}):
+        selected = [row for row in rows if row["mode"] == mode]
+        print(
+            f"{mode:>10}: {sum(r['input_tokens'] for r in selected)} input tokens, "
+            f"median latency {statistics.median(r['latency_median_s'] for r in selected):.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
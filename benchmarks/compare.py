@@ -0,0 +1,46 @@
+"""
+Compares two benchmark result files and flags cases that got slower.
+
+Usage:
+    python -m benchmarks.compare old.json new.json --threshold 0.10
+"""
+
+import argparse
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="Relative slowdown of the median that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    print(f"{baseline['meta']['commit']} -> {candidate['meta']['commit']}")
+    regressions = 0
+    for case, new in candidate["results"].items():
+        old = baseline["results"].get(case)
+        if old is None:
+            print(f"  {case:<45} {new['median_s']:.4f}s (new)")
+            continue
+        change = new["median_s"] / old["median_s"] - 1
+        flag = ""
+        if change > args.threshold:
+            flag = "  <-- REGRESSION"
+            regressions += 1
+        print(f"  {case:<45} {old['median_s']:.4f}s -> {new['median_s']:.4f}s "
+              f"({change:+.1%}){flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Offline stand-in for genai.Client, for benchmarks and local runs without Vertex AI.
+
+Install it with backend.connectors.gemini_connector.set_client(FakeClient(...)).
+"""
+
+import json
+import random
+import threading
+import time
+
+from google.genai import errors
+
+from backend.lib.heuristic_classifier import first_pages_text, score_text
+from benchmarks.synthetic import make_payload
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+def _fake_answer(config, contents, list_sizes):
+    schema = config.response_schema
+    if "Fonte_documento" in schema.get("properties", {}):
+        document = contents[0].parts[1].inline_data.data
+        scores = score_text(first_pages_text(document))
+        return {"Fonte_documento": max(scores, key=scores.get)}
+    return make_payload(schema, list_sizes)
+
+
+def _resource_exhausted():
+    return errors.ClientError(
+        429,
+        {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Quota exceeded (fake)."}},
+    )
+
+
+def _split(text, chunk_size):
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [""]
+
+
+class _Models:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content_stream(self, model, contents, config):
+        client = self._client
+        client._start()
+        try:
+            time.sleep(client.latency)
+            text = json.dumps(_fake_answer(config, contents, client.list_sizes), ensure_ascii=False)
+            for piece in _split(text, client.chunk_size):
+                time.sleep(client.chunk_latency)
+                yield _Chunk(piece)
+        finally:
+            client._finish()
+
+
+class FakeClient:
+    """
+    Answers classification from the document's text and extraction with a synthetic
+    payload for the requested schema, after `latency` seconds plus `chunk_latency`
+    per streamed chunk of `chunk_size` characters.
+
+    To exercise rate limiting, calls fail with a 429 RESOURCE_EXHAUSTED error when more
+    than `max_concurrent` are already in flight, and at random with probability
+    `error_rate`.
+    """
+
+    def __init__(
+        self,
+        latency=0.5,
+        chunk_latency=0.0,
+        chunk_size=400,
+        list_sizes=None,
+        max_concurrent=None,
+        error_rate=0.0,
+    ):
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.chunk_size = chunk_size
+        self.list_sizes = list_sizes or {"transacoes": 50, "saldos": 12, "saldos.items": 4}
+        self.max_concurrent = max_concurrent
+        self.error_rate = error_rate
+        self.calls = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self.models = _Models(self)
+
+    def _start(self):
+        with self._lock:
+            self.calls += 1
+            if (
+                self.max_concurrent is not None and self.in_flight >= self.max_concurrent
+            ) or random.random() < self.error_rate:
+                self.throttled += 1
+                raise _resource_exhausted()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _finish(self):
+        with self._lock:
+            self.in_flight -= 1
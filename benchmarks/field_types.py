@@ -0,0 +1,93 @@
+"""
+Compares raw (all-string) flattened frames against typed ones (see field_types.py).
+
+For each source it reports the memory of both frames, the cost of typing them, and
+the time of a typical aggregation (total of every amount column per category of the
+first category column), which on the raw frame has to parse the strings every time.
+
+Usage:
+    python -m benchmarks.field_types --records 20 --transactions 2000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from backend.lib.field_types import column_types, typed_frame
+from backend.lib.flatten import get_flattener
+from backend.schemas import SCHEMAS
+from benchmarks.synthetic import make_payload
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def raw_totals(frame, amounts, key):
+    """Aggregation on the raw frame: amount strings parsed to floats on every query."""
+    parsed = {
+        column: pd.to_numeric(
+            frame[column].str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+        )
+        for column in amounts
+    }
+    return pd.DataFrame(parsed).groupby(frame[key]).sum()
+
+
+def typed_totals(frame, amounts, key):
+    return frame.groupby(key, observed=True)[amounts].sum()
+
+
+def megabytes(frame):
+    return frame.memory_usage(deep=True).sum() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=20, help="Extractions per source")
+    parser.add_argument("--transactions", type=int, default=2000, help="BNB transacoes")
+    parser.add_argument("--saldos", type=int, default=60, help="BNDES saldos")
+    parser.add_argument("--items", type=int, default=40, help="BNDES saldos.items")
+    parser.add_argument("--tables", type=int, default=20, help="FDNE tabelas")
+    parser.add_argument("--rows", type=int, default=50, help="FDNE tabelas.Dados")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = {
+        "BNB": {"transacoes": args.transactions},
+        "BNDES": {"saldos": args.saldos, "saldos.items": args.items},
+        "FDNE": {"tabelas": args.tables, "tabelas.Dados": args.rows},
+    }
+    for source, list_sizes in sizes.items():
+        types = column_types(source)
+        records = [
+            make_payload(SCHEMAS[source], list_sizes, seed=seed, types=types)
+            for seed in range(args.records)
+        ]
+        raw = get_flattener(source).to_frame(records)
+        convert_time, typed = best_of(lambda: typed_frame(raw, source), args.repeat)
+
+        amounts = [column for column, kind in types.items() if kind == "amount"]
+        key = next(column for column, kind in types.items() if kind == "category" and column in raw)
+        raw_time, raw_result = best_of(lambda: raw_totals(raw, amounts, key), args.repeat)
+        typed_time, typed_result = best_of(lambda: typed_totals(typed, amounts, key), args.repeat)
+        same = (
+            (raw_result * 100).round().astype("int64").to_numpy()
+            == typed_result.astype("int64").to_numpy()
+        ).all()
+        print(
+            f"{source:>5}: {len(raw):>8} rows | memory {megabytes(raw):8.1f} MB raw, "
+            f"{megabytes(typed):7.1f} MB typed | typing {convert_time:.3f}s | "
+            f"totals by '{key}' {raw_time:.4f}s raw, {typed_time:.4f}s typed "
+            f"({raw_time / typed_time:.0f}x) | same totals: {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares recursive_expand_rows + DataFrame against the schema-compiled flattener.
+
+Usage:
+    python -m benchmarks.flatten --records 20 --transactions 2000 --saldos 60 --items 40
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from backend.lib.flatten import get_flattener
+from backend.lib.funcs import recursive_expand_rows
+from backend.schemas import LIST_KEYS, SCHEMAS
+from benchmarks.synthetic import make_payload
+
+
+def recursive_frame(records, source):
+    rows = []
+    for record in records:
+        rows.extend(recursive_expand_rows(record, LIST_KEYS[source]))
+    return pd.DataFrame(rows)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=20, help="Extractions per source")
+    parser.add_argument("--transactions", type=int, default=2000, help="BNB transacoes")
+    parser.add_argument("--saldos", type=int, default=60, help="BNDES saldos")
+    parser.add_argument("--items", type=int, default=40, help="BNDES saldos.items")
+    parser.add_argument("--tables", type=int, default=20, help="FDNE tabelas")
+    parser.add_argument("--rows", type=int, default=50, help="FDNE tabelas.Dados")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = {
+        "BNB": {"transacoes": args.transactions},
+        "BNDES": {"saldos": args.saldos, "saldos.items": args.items},
+        "FDNE": {"tabelas": args.tables, "tabelas.Dados": args.rows},
+    }
+    for source, list_sizes in sizes.items():
+        records = [
+            make_payload(SCHEMAS[source], list_sizes, seed=seed) for seed in range(args.records)
+        ]
+        flattener = get_flattener(source)
+        old_time, old = best_of(lambda: recursive_frame(records, source), args.repeat)
+        new_time, new = best_of(lambda: flattener.to_frame(records), args.repeat)
+        same = old.shape == new.shape and old[new.columns].equals(new)
+        print(
+            f"{source:>5}: {len(new):>8} rows x {len(new.columns):>3} cols | "
+            f"recursive {old_time:.3f}s | compiled {new_time:.3f}s | "
+            f"{old_time / new_time:.1f}x | identical values: {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
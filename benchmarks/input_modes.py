@@ -0,0 +1,128 @@
+"""
+Compares the "pdf" and "text" input modes (see INPUT_MODES in config.py) per source.
+
+For every statement (BNB exports are split like the pipeline does) it reports the
+payload size and estimated input tokens of each mode, the time to read the text
+layer and how many pages had to stay PDF. With --llm it also sends both payloads
+to the model, bypassing the cache, and reports latency, the input tokens billed and
+how many fields of the two answers differ. That needs the same credentials as the app.
+
+Usage:
+    python -m benchmarks.input_modes statements/**/*.pdf --llm --report modes.json
+    python -m benchmarks.input_modes --synthetic 5
+"""
+
+import argparse
+import glob
+import json
+import time
+from pathlib import Path
+
+from backend.config import MODEL
+from backend.lib.funcs import flatten_json, iter_split_pdf
+from backend.lib.heuristic_classifier import classify_locally
+from backend.lib.instrumentation import metrics_run
+from backend.lib.rate_limit import estimate_tokens
+from backend.lib.text_layer import input_mode, payload_size, text_payload
+from backend.prompts import PROMPTS, TEXT_INPUT_NOTE
+from benchmarks.synthetic import make_bnb_statement_pdf, make_statement_pdf
+
+
+def run_document(name: str, source: str, document: bytes, use_llm: bool) -> dict:
+    entry = {"document": name, "source": source}
+    start = time.perf_counter()
+    payload = text_payload(document)
+    entry["text_layer_s"] = time.perf_counter() - start
+    entry["text_mode"] = input_mode(payload)
+    for mode, sent, prompt in (
+        ("pdf", document, PROMPTS["extractor"]),
+        ("text", payload, PROMPTS["extractor"] + TEXT_INPUT_NOTE),
+    ):
+        entry[f"{mode}_bytes"] = payload_size(sent)
+        entry[f"{mode}_tokens_estimated"] = estimate_tokens(prompt, sent)
+
+    if use_llm:
+        # Imported here so runs without --llm need no Vertex AI credentials
+        from backend.connectors.gemini_connector import generate_response
+        from backend.schemas import SCHEMAS
+
+        answers = {}
+        for mode, sent, prompt in (
+            ("pdf", document, PROMPTS["extractor"]),
+            ("text", payload, PROMPTS["extractor"] + TEXT_INPUT_NOTE),
+        ):
+            with metrics_run(f"{name} {mode}") as run:
+                start = time.perf_counter()
+                answers[mode] = generate_response(MODEL, prompt, SCHEMAS[source], sent)
+                entry[f"{mode}_s"] = time.perf_counter() - start
+            entry[f"{mode}_input_tokens"] = sum(row["input_tokens"] for row in run.summary())
+        pdf_fields, text_fields = flatten_json(answers["pdf"]), flatten_json(answers["text"])
+        entry["fields"] = len(set(pdf_fields) | set(text_fields))
+        entry["fields_differing"] = sorted(
+            key for key in set(pdf_fields) | set(text_fields)
+            if pdf_fields.get(key) != text_fields.get(key)
+        )
+    return entry
+
+
+def documents(paths):
+    for path in paths:
+        data = Path(path).read_bytes()
+        source, _ = classify_locally(data)
+        if source is None:
+            print(f"Skipping '{path}': source not recognized")
+            continue
+        if source == "BNB":
+            for index, (sub_doc, _) in enumerate(iter_split_pdf(data), start=1):
+                yield f"{Path(path).name}#{index}", source, sub_doc.getvalue()
+        else:
+            yield Path(path).name, source, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="*", help="Statement PDFs or glob patterns")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Also measure this many synthetic statements of each source")
+    parser.add_argument("--pages", type=int, default=3, help="Pages per synthetic statement")
+    parser.add_argument("--llm", action="store_true", help="Send both payloads to the model")
+    parser.add_argument("--report", help="Write every document's numbers to this JSON file")
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.inputs for p in glob.glob(pattern, recursive=True)})
+    entries = [run_document(*document, use_llm=args.llm) for document in documents(paths)]
+    for index in range(args.synthetic):
+        synthetic = [("BNB", make_bnb_statement_pdf(args.pages, seed=index))]
+        synthetic += [(source, make_statement_pdf(source, args.pages)) for source in ("BNDES", "FDNE")]
+        for source, document in synthetic:
+            entries.append(run_document(f"synthetic-{source}#{index + 1}", source, document, args.llm))
+    if not entries:
+        parser.error("no input PDFs and no --synthetic statements")
+
+    for source in sorted({entry["source"] for entry in entries}):
+        rows = [entry for entry in entries if entry["source"] == source]
+        mean = lambda key: sum(entry[key] for entry in rows) / len(rows)  # noqa: E731
+        mixed = sum(entry["text_mode"] != "text" for entry in rows)
+        line = (
+            f"{source:>5}: {len(rows)} document(s) | payload {mean('pdf_bytes') / 1024:.1f} KB pdf, "
+            f"{mean('text_bytes') / 1024:.1f} KB text | estimated tokens "
+            f"{mean('pdf_tokens_estimated'):.0f} pdf, {mean('text_tokens_estimated'):.0f} text | "
+            f"text layer {1000 * mean('text_layer_s'):.0f} ms | with PDF pages: {mixed}"
+        )
+        if args.llm:
+            differing = sum(len(entry["fields_differing"]) for entry in rows)
+            fields = sum(entry["fields"] for entry in rows)
+            line += (
+                f"\n       latency {mean('pdf_s'):.2f}s pdf, {mean('text_s'):.2f}s text | input tokens "
+                f"{mean('pdf_input_tokens'):.0f} pdf, {mean('text_input_tokens'):.0f} text | "
+                f"fields differing {differing}/{fields}"
+            )
+        print(line)
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Wrote '{args.report}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares raw content-stream page-number scanning against full text extraction.
+
+Usage:
+    python -m benchmarks.page_scan --statements 60 --pages-per-statement 5
+    python -m benchmarks.page_scan --input export.pdf
+"""
+
+import argparse
+import io
+import random
+import time
+
+import pypdf
+
+from backend.lib.funcs import find_page_numbering, scan_page_numbering
+from benchmarks.synthetic import make_bnb_pdf
+
+
+def full_extraction(page):
+    return find_page_numbering(page.extract_text() or "")
+
+
+def time_scanner(pdf_bytes: bytes, scanner) -> tuple:
+    # Fresh reader each run so no parsed objects are reused between scanners
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    start = time.perf_counter()
+    found = [scanner(page) for page in reader.pages]
+    return time.perf_counter() - start, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", help="Scan a real PDF instead of a synthetic one")
+    parser.add_argument("--statements", type=int, default=60)
+    parser.add_argument("--pages-per-statement", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=40, help="Transaction rows per page")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "rb") as f:
+            pdf_bytes = f.read()
+    else:
+        rng = random.Random(0)
+        lengths = [
+            rng.randint(1, 2 * args.pages_per_statement - 1) for _ in range(args.statements)
+        ]
+        pdf_bytes = make_bnb_pdf(lengths, args.rows)
+
+    full_time, full_found = time_scanner(pdf_bytes, full_extraction)
+    scan_time, scan_found = time_scanner(pdf_bytes, scan_page_numbering)
+    pages = len(full_found)
+    agree = sum(a == b for a, b in zip(full_found, scan_found))
+    fallbacks = sum(found is None for found in scan_found)
+
+    print(f"pages: {pages}")
+    print(f"full extraction: {full_time:.3f}s ({1000 * full_time / pages:.2f} ms/page)")
+    print(f"raw scan:        {scan_time:.3f}s ({1000 * scan_time / pages:.2f} ms/page)")
+    print(f"speedup: {full_time / scan_time:.1f}x, agreement {agree}/{pages}, "
+          f"pages needing fallback {fallbacks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmark suite for the split, flatten and pipeline hot paths.
+
+Everything runs offline on synthetic statements; the pipeline case uses
+benchmarks.fake_client.FakeClient with a configurable latency. Results are written
+as JSON (by default to benchmarks/results/<commit>.json) so two commits can be
+compared with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --only split flatten --statements 100 --latency 0.2
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+
+import os
+
+# The persistent extraction cache would turn repeated pipeline runs into cache hits
+os.environ["LOAN_READER_CACHE_DIR"] = ""
+
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+import pypdf
+
+from backend.connectors.gemini_connector import set_client
+from backend.lib.flatten import get_flattener
+from backend.lib.funcs import iter_boundaries_jump, iter_boundaries_linear, split_pdf_in_memory
+from backend.lib.pipeline import process_documents
+from backend.schemas import SCHEMAS
+from benchmarks.fake_client import FakeClient
+from benchmarks.flatten import recursive_frame
+from benchmarks.synthetic import make_bnb_pdf, make_payload, make_statement_pdf
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def measure(fn, repeat):
+    """Runs fn `repeat` times; returns timing stats (seconds) and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return {"min_s": min(timings), "median_s": statistics.median(timings)}, result
+
+
+def bench_split(args):
+    rng = random.Random(0)
+    lengths = [rng.randint(1, 2 * args.pages_per_statement - 1) for _ in range(args.statements)]
+    pdf_bytes = make_bnb_pdf(lengths, args.rows)
+    pages = sum(lengths)
+
+    def boundaries(finder, fast_scan):
+        return lambda: list(finder(pypdf.PdfReader(io.BytesIO(pdf_bytes)), fast_scan))
+
+    cases = {
+        "split.boundaries.linear_full_text": boundaries(iter_boundaries_linear, False),
+        "split.boundaries.jump_full_text": boundaries(iter_boundaries_jump, False),
+        "split.boundaries.linear_fast_scan": boundaries(iter_boundaries_linear, True),
+        "split.boundaries.jump_fast_scan": boundaries(iter_boundaries_jump, True),
+        "split.split_pdf_in_memory": lambda: split_pdf_in_memory(pdf_bytes),
+    }
+    results = {}
+    for name, fn in cases.items():
+        stats, _ = measure(fn, args.repeat)
+        stats.update(pages=pages, statements=len(lengths))
+        results[name] = stats
+    return results
+
+
+def bench_flatten(args):
+    sizes = {
+        "BNB": {"transacoes": args.transactions},
+        "BNDES": {"saldos": args.saldos, "saldos.items": args.items},
+        "FDNE": {"tabelas": args.tables, "tabelas.Dados": args.table_rows},
+    }
+    results = {}
+    for source, list_sizes in sizes.items():
+        records = [
+            make_payload(SCHEMAS[source], list_sizes, seed=seed) for seed in range(args.records)
+        ]
+        old, frame = measure(lambda: recursive_frame(records, source), args.repeat)
+        new, _ = measure(lambda: get_flattener(source).to_frame(records), args.repeat)
+        old["rows"] = new["rows"] = len(frame)
+        results[f"flatten.{source}.recursive_expand_rows"] = old
+        results[f"flatten.{source}.compiled"] = new
+    return results
+
+
+def bench_pipeline(args):
+    rng = random.Random(1)
+    documents = []
+    for index in range(args.files):
+        source = ("BNB", "BNDES", "FDNE")[index % 3]
+        if source == "BNB":
+            pdf_bytes = make_bnb_pdf(
+                [rng.randint(1, 4) for _ in range(args.bnb_parts)], args.rows, seed=index * args.bnb_parts
+            )
+        else:
+            pdf_bytes = make_statement_pdf(source, rng.randint(1, 4), args.rows, seed=index)
+        documents.append((f"{source}_{index}.pdf", pdf_bytes))
+
+    client = FakeClient(latency=args.latency, list_sizes={"transacoes": args.transactions})
+    set_client(client)
+    try:
+        stats, results = measure(
+            lambda: process_documents(documents, max_workers=args.workers), args.repeat
+        )
+    finally:
+        set_client(None)
+    parts = sum(len(parts) for parts in results.values())
+    stats.update(
+        files=len(documents),
+        parts=parts,
+        llm_calls=client.calls // args.repeat,
+        latency_s=args.latency,
+        workers=args.workers,
+        parts_per_s=parts / stats["median_s"],
+    )
+    return {"pipeline.process_documents": stats}
+
+
+SUITES = {"split": bench_split, "flatten": bench_flatten, "pipeline": bench_pipeline}
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), help="Suites to run")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--repeat", type=int, default=3)
+    split = parser.add_argument_group("split")
+    split.add_argument("--statements", type=int, default=60, help="Statements in the export")
+    split.add_argument("--pages-per-statement", type=int, default=5, help="Average length")
+    split.add_argument("--rows", type=int, default=40, help="Text rows per page")
+    flatten = parser.add_argument_group("flatten")
+    flatten.add_argument("--records", type=int, default=10, help="Extractions per source")
+    flatten.add_argument("--transactions", type=int, default=1000, help="BNB transacoes")
+    flatten.add_argument("--saldos", type=int, default=30, help="BNDES saldos")
+    flatten.add_argument("--items", type=int, default=20, help="BNDES saldos.items")
+    flatten.add_argument("--tables", type=int, default=10, help="FDNE tabelas")
+    flatten.add_argument("--table-rows", type=int, default=20, help="FDNE tabelas.Dados")
+    pipeline = parser.add_argument_group("pipeline")
+    pipeline.add_argument("--files", type=int, default=12, help="Uploaded files")
+    pipeline.add_argument("--bnb-parts", type=int, default=4, help="Statements per BNB file")
+    pipeline.add_argument("--latency", type=float, default=0.3, help="Fake LLM latency (s)")
+    pipeline.add_argument("--workers", type=int, default=8, help="Pipeline max_workers")
+    args = parser.parse_args()
+
+    commit = current_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "params": vars(args),
+        },
+        "results": {},
+    }
+    for name in args.only or SUITES:
+        print(f"Running '{name}'...")
+        for case, stats in SUITES[name](args).items():
+            report["results"][case] = stats
+            print(f"  {case:<45} {stats['median_s']:.4f}s")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
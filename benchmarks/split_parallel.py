@@ -0,0 +1,76 @@
+"""
+Times the page-number scan of a large concatenated BNB export with 1 to N processes.
+
+Every page is read (the serial run uses iter_boundaries_linear, the others
+iter_boundaries_parallel), so the runs compare like for like; the jump-ahead scan
+used by default is timed too, for reference. Boundaries must match across runs.
+Speedup is bounded by the machine's cores (os.cpu_count() is printed).
+
+Usage:
+    python -m benchmarks.split_parallel --statements 200 --workers 1 2 4 8
+    python -m benchmarks.split_parallel --input export.pdf --full-extraction
+"""
+
+import argparse
+import io
+import os
+import random
+import time
+
+import pypdf
+
+from backend.lib.funcs import iter_boundaries_jump, iter_boundaries_linear, iter_boundaries_parallel
+from benchmarks.synthetic import make_bnb_pdf
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = list(fn())
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", help="Scan a real PDF instead of a synthetic one")
+    parser.add_argument("--statements", type=int, default=200)
+    parser.add_argument("--pages-per-statement", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=40, help="Transaction rows per page")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--full-extraction", action="store_true",
+                        help="Extract each page's text instead of scanning its content stream")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "rb") as f:
+            pdf_bytes = f.read()
+    else:
+        rng = random.Random(0)
+        lengths = [
+            rng.randint(1, 2 * args.pages_per_statement - 1) for _ in range(args.statements)
+        ]
+        pdf_bytes = make_bnb_pdf(lengths, args.rows)
+    fast_scan = not args.full_extraction
+    pages = len(pypdf.PdfReader(io.BytesIO(pdf_bytes)).pages)
+    print(f"pages: {pages}, size {len(pdf_bytes) / 2**20:.1f} MB, cores: {os.cpu_count()}")
+
+    # Fresh reader per run so no parsed objects are reused between runs
+    reader = lambda: pypdf.PdfReader(io.BytesIO(pdf_bytes))  # noqa: E731
+    jump_time, expected = timed(lambda: iter_boundaries_jump(reader(), fast_scan))
+    print(f"  jump-ahead (reference) {jump_time:7.3f}s, {len(expected)} statements")
+    serial_time = None
+    for workers in args.workers:
+        if workers <= 1:
+            seconds, found = timed(lambda: iter_boundaries_linear(reader(), fast_scan))
+        else:
+            seconds, found = timed(
+                lambda: iter_boundaries_parallel(pdf_bytes, pages, workers, fast_scan)
+            )
+        serial_time = serial_time or seconds
+        print(
+            f"  {workers} process(es)          {seconds:7.3f}s ({1000 * seconds / pages:.2f} ms/page)"
+            f" | speedup {serial_time / seconds:.2f}x | boundaries match: {found == expected}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Measures cold start: import time of the modules the app and the workers load, and
+time to a first result with and without warm-up (see backend/warmup.py).
+
+Every measurement runs in a fresh interpreter, so nothing is already imported.
+Time to a first result covers flattening one extraction (the results page) and
+processing one synthetic BNB statement, which the local parser (turned on here)
+handles without the LLM; neither needs credentials. --client also warms up the Gemini client.
+
+Usage:
+    python -m benchmarks.startup --repeat 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules loaded by app.py and the pages, then by a job worker
+MODULES = [
+    "streamlit",
+    "backend.lib.jobs",
+    "backend.lib.export",
+    "backend.worker",
+    "backend.lib.pipeline",
+    "backend.connectors.gemini_connector",
+]
+
+# Packages worth knowing about when they show up in an import
+HEAVY_PACKAGES = ["pandas", "numpy", "pyarrow", "pypdf", "google.genai"]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [p for p in {heavy!r} if p in sys.modules]}}))
+"""
+
+FIRST_RESULT_SNIPPET = """
+import json, time
+start = time.perf_counter()
+timings = {{}}
+if {warm}:
+    from backend.warmup import warm_up
+    timings = warm_up(pipeline=True, client={client})
+warm_s = time.perf_counter() - start
+
+from benchmarks.synthetic import make_bnb_statement_pdf, make_payload
+from backend.schemas import SCHEMAS
+document = make_bnb_statement_pdf(3)
+record = make_payload(SCHEMAS["BNB"], {{"transacoes": 50}})
+
+start = time.perf_counter()
+from backend.lib.flatten import get_flattener
+get_flattener("BNB").to_frame([record])
+flatten_s = time.perf_counter() - start
+
+start = time.perf_counter()
+from backend.lib.pipeline import process_documents
+results = process_documents([("statement.pdf", document)])
+pipeline_s = time.perf_counter() - start
+print(json.dumps({{
+    "warm_up_s": warm_s, "steps": timings, "first_table_s": flatten_s,
+    "first_statement_s": pipeline_s,
+    "parts_ok": sum(part["Conteúdo"] is not None for part in results["statement.pdf"]),
+}}))
+"""
+
+
+def run_snippet(code: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per measurement")
+    parser.add_argument("--client", action="store_true",
+                        help="Also create the Gemini client during warm-up (needs credentials)")
+    args = parser.parse_args()
+
+    # No cache, so the first statement is really processed, and the synthetic
+    # statement classified locally (its keyword score is below the default threshold)
+    env = {
+        **os.environ,
+        "LOAN_READER_CACHE_DIR": "",
+        "LOAN_READER_METRICS_FILE": "",
+        "LOAN_READER_HEURISTIC_MIN_CONFIDENCE": "0.5",
+        "LOAN_READER_BNB_LOCAL_PARSER": "1",
+    }
+
+    print("import time (fresh interpreter, best of runs):")
+    for module in MODULES:
+        try:
+            runs = [
+                run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_PACKAGES), env)
+                for _ in range(args.repeat)
+            ]
+        except subprocess.CalledProcessError as e:
+            print(f"  {module:<38} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        best = min(runs, key=lambda run: run["seconds"])
+        print(f"  {module:<38} {1000 * best['seconds']:7.0f} ms   loads: {', '.join(best['heavy']) or '-'}")
+
+    print("time to first result:")
+    for warm in (False, True):
+        runs = [
+            run_snippet(FIRST_RESULT_SNIPPET.format(warm=warm, client=args.client), env)
+            for _ in range(args.repeat)
+        ]
+        best = min(runs, key=lambda run: run["first_table_s"] + run["first_statement_s"])
+        if not best["parts_ok"]:
+            print("  Warning: the synthetic statement was not extracted; timings include the failure.")
+        steps = ", ".join(f"{name} {1000 * s:.0f} ms" for name, s in best["steps"].items())
+        print(
+            f"  {'after warm-up' if warm else 'cold':<14} first table {1000 * best['first_table_s']:6.0f} ms"
+            f" | first statement {1000 * best['first_statement_s']:6.0f} ms"
+            + (f" | warm-up {1000 * best['warm_up_s']:.0f} ms ({steps})" if warm else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
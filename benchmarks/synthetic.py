@@ -0,0 +1,237 @@
+"""Builders for synthetic statement-shaped PDFs used by the benchmarks."""
+
+import io
+from typing import List, Optional, Sequence
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _font(writer: PdfWriter):
+    return writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+                NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+            }
+        )
+    )
+
+
+def _add_text_page(writer: PdfWriter, font_ref, lines: List[str]) -> None:
+    page = writer.add_blank_page(595, 842)
+    operations = "".join(
+        f"BT /F1 8 Tf 30 {810 - 12 * row} Td ({_escape(line)}) Tj ET\n"
+        for row, line in enumerate(lines)
+    )
+    stream = DecodedStreamObject()
+    stream.set_data(operations.encode("cp1252"))
+    page[NameObject("/Contents")] = writer._add_object(stream)
+    page[NameObject("/Resources")] = DictionaryObject(
+        {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font_ref})}
+    )
+
+
+def bnb_page_lines(page: int, total: int, rows: int, seed: int = 0) -> List[str]:
+    lines = [
+        f"BANCO DO NORDESTE DO BRASIL S.A.          Pág {page} de {total}",
+        "EXTRATO DE OPERAÇÃO DE CRÉDITO",
+        f"Área de Crédito: INFRAESTRUTURA   Código da Operação: 191.101.{324 + seed:03d}",
+        "Data Lanç.  Data Valor.  D/C  Histórico   Valor Normal   Saldo Normal   Saldo Atraso",
+    ]
+    for row in range(rows):
+        day = row % 28 + 1
+        lines.append(
+            f"{day:02d}/01/2024  {day:02d}/01/2024  D  AMORTIZACAO PARCELA "
+            f"{row + 1:>4}   1.234,{row % 100:02d}   987.654,{row % 100:02d}   0,00"
+        )
+    return lines
+
+
+def make_bnb_pdf(document_lengths: Sequence[int], rows_per_page: int = 40, seed: int = 0) -> bytes:
+    """
+    Concatenated BNB-style export: one statement per entry of document_lengths,
+    each page printing 'Pág X de Y' in its header followed by transaction rows.
+    Statement k gets operation code seed + k, so no two statements of an export
+    are identical (the pipeline would extract identical ones only once).
+    """
+    writer = PdfWriter()
+    font_ref = _font(writer)
+    for index, total in enumerate(document_lengths):
+        for page in range(1, total + 1):
+            _add_text_page(writer, font_ref, bnb_page_lines(page, total, rows_per_page, seed + index))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+# Helvetica advance widths (1/1000 em) of the characters used in amounts
+_AMOUNT_WIDTHS = {**{digit: 556 for digit in "0123456789"}, ".": 278, ",": 278, "-": 333}
+
+
+def _add_cells_page(writer: PdfWriter, font_ref, rows: List[List[tuple]]) -> None:
+    """Page of positioned cells: each row is a list of (x, text, right_aligned)."""
+    page = writer.add_blank_page(842, 595)
+    operations = []
+    for index, cells in enumerate(rows):
+        y = 570 - 11 * index
+        for x, text, right_aligned in cells:
+            if right_aligned:
+                x -= sum(_AMOUNT_WIDTHS.get(ch, 556) for ch in text) * 7 / 1000
+            operations.append(f"BT /F1 7 Tf {x:.2f} {y} Td ({_escape(text)}) Tj ET\n")
+    stream = DecodedStreamObject()
+    stream.set_data("".join(operations).encode("cp1252"))
+    page[NameObject("/Contents")] = writer._add_object(stream)
+    page[NameObject("/Resources")] = DictionaryObject(
+        {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font_ref})}
+    )
+
+
+def _brl(cents: int) -> str:
+    text = f"{abs(cents) // 100:,}".replace(",", ".") + f",{abs(cents) % 100:02d}"
+    return f"-{text}" if cents < 0 else text
+
+
+# Right edges of the six amount columns of the full BNB layout
+_BNB_AMOUNT_COLUMNS = [430, 495, 560, 625, 690, 755]
+
+
+def make_bnb_statement_pdf(pages: int, rows_per_page: int = 30, seed: int = 0) -> bytes:
+    """
+    Single BNB statement in the full layout (header fields, initial balance,
+    transaction table with normal/arrears/loss columns, final balances and totals),
+    with consistent running balances, for the local BNB parser.
+    """
+    writer = PdfWriter()
+    font_ref = _font(writer)
+    balance = 150_000_000_00 + seed
+    total_paid = 0
+    column_cells = lambda values: [  # noqa: E731
+        (x, value, True) for x, value in zip(_BNB_AMOUNT_COLUMNS, values) if value
+    ]
+    for page in range(1, pages + 1):
+        rows = [
+            [(20, "BANCO DO NORDESTE DO BRASIL S.A.", False), (560, f"Pág {page} de {pages}", False),
+             (680, "15/01/2025 10:42:17", False)],
+            [(20, "EXTRATO DE OPERAÇÃO DE CRÉDITO", False), (400, "Agência: 0123 - FORTALEZA", False)],
+            [(20, "Cliente: VENTOS DE SAO JOAQUIM ENERGIAS RENOVAVEIS S.A.", False),
+             (400, "Endereço: AV. SANTOS DUMONT, 1000 - FORTALEZA/CE", False)],
+            [(20, "Período: 01/12/2024 a 31/12/2024", False),
+             (400, "Área de Crédito: INFRAESTRUTURA", False)],
+            [(20, f"Código da Operação: 191.101.{324 + seed:03d}", False),
+             (400, "Valor da Operação: 250.000.000,00", False)],
+            [(20, "Data do Contrato: 15/03/2019", False), (400, "Vencimento Final: 15/03/2039", False)],
+            [(20, "Moeda da Operação: REAL", False), (400, "Moeda Indexadora: IPCA", False)],
+            [(20, "Programa: FNE PROINFRA", False)],
+        ]
+        if page == 1:
+            rows.append([(20, "Saldo Inicial", False), *column_cells([None, _brl(balance), None, "0,00", None, "0,00"])])
+        rows.append([(441, "NORMAL", False), (571, "ATRASO", False), (698, "PREJUÍZO", False)])
+        rows.append([(20, "Data Lanç.", False), (70, "Data Valor.", False), (120, "D/C", False),
+                     (145, "Histórico", False), (410, "Valor", False), (470, "Saldo", False),
+                     (540, "Valor", False), (600, "Saldo", False), (670, "Valor", False), (730, "Saldo", False)])
+        for row in range(rows_per_page):
+            index = (page - 1) * rows_per_page + row
+            day = f"{index % 28 + 1:02d}/12/2024"
+            if index % 5 == 4:
+                debit, amount, text = "C", 1_234_567_00 + index, "AMORTIZACAO DE PRINCIPAL"
+                balance -= amount
+                total_paid += amount
+            else:
+                debit, amount, text = "D", 98_765_43 + index * 17, "JUROS DE NORMALIDADE"
+                balance += amount
+            rows.append([(20, day, False), (70, day, False), (125, debit, False), (145, text, False),
+                         *column_cells([_brl(amount), _brl(balance), None, "0,00", None, "0,00"])])
+        if page == pages:
+            rows.append([(20, "SALDO FINAL", False)])
+            rows.append([(20, "Principal", False),
+                         *column_cells([None, _brl(balance), None, "0,00", None, "0,00"])])
+            rows.append([(20, "Jus/Bas/Var", False), *column_cells([None, "0,00", None, "0,00", None, "0,00"])])
+            rows.append([(20, "Total Cliente/Operação", False), *column_cells([_brl(total_paid), None, "0,00", None, "0,00", None])])
+            rows.append([(20, "Total Geral Pago", False), (430, _brl(total_paid), True)])
+        _add_cells_page(writer, font_ref, rows)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def bndes_page_lines(page: int, total: int, rows: int, seed: int = 0) -> List[str]:
+    lines = [
+        "BNDES - Banco Nacional de Desenvolvimento Econômico e Social",
+        f"Razão Social: VENTOS DE SAO JOAQUIM ENERGIAS RENOVAVEIS S.A.   Página {page} de {total}",
+        f"Contrato: 21.2.{seed:04d}.1",
+        "Subcrédito Financeiro: A   Custo Financeiro: TJLP   Taxa BNDES: 1,90%   Taxa do Agente: 0,00%",
+        "Carência: 6 meses   Amortização: 192 meses",
+        "Data        Saldo                      Valor",
+    ]
+    for row in range(rows):
+        lines.append(f"{row % 28 + 1:02d}/{page % 12 + 1:02d}/2024  SALDO DEVEDOR   1.234.567,{row % 100:02d}")
+    return lines
+
+
+def fdne_page_lines(page: int, total: int, rows: int, seed: int = 0) -> List[str]:
+    lines = [
+        "FDNE - FUNDO DE DESENVOLVIMENTO DO NORDESTE",
+        "Empresa: VENTOS DE SAO JOAQUIM ENERGIAS RENOVAVEIS S.A.   Data Referência: 31/12/2024",
+        f"Contrato: FDNE-{seed:04d}",
+        "LINHA   OPERAÇÃO Nº   SALDO CAPITALIZADO   JUROS   SALDO DEVEDOR",
+    ]
+    for row in range(rows):
+        lines.append(
+            f"FDNE FUNDO DE DESENVOLVIMENTO  191.101.{row:03d}  214.594.362,{row % 100:02d}  "
+            f"7.171.595,78  221.765.958,37"
+        )
+    return lines
+
+
+PAGE_BUILDERS = {"BNB": bnb_page_lines, "BNDES": bndes_page_lines, "FDNE": fdne_page_lines}
+
+
+def make_statement_pdf(source: str, pages: int, rows_per_page: int = 40, seed: int = 0) -> bytes:
+    """
+    Single statement of the given source ('BNB', 'BNDES' or 'FDNE'). Different
+    seeds give statements with different contract numbers.
+    """
+    if source == "BNB":
+        return make_bnb_pdf([pages], rows_per_page, seed)
+    writer = PdfWriter()
+    font_ref = _font(writer)
+    for page in range(1, pages + 1):
+        _add_text_page(writer, font_ref, PAGE_BUILDERS[source](page, pages, rows_per_page, seed))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def make_payload(
+    schema: dict, list_sizes: dict, path: str = "", seed: int = 0, types: Optional[dict] = None
+) -> object:
+    """
+    Extraction-shaped JSON for a SCHEMAS entry. Arrays get list_sizes[path] items
+    (e.g. {"saldos": 12, "saldos.items": 30}), 1 by default. String leaves get
+    amounts in Brazilian format so values differ between rows, unless types (column
+    -> FIELD_TYPES kind) makes them a DD/MM/YYYY "date" or one of a few "category" values.
+    """
+    types = types or {}
+    node_type = schema.get("type", "string").lower()
+    if node_type == "object":
+        return {
+            key: make_payload(child, list_sizes, f"{path}.{key}" if path else key, seed, types)
+            for key, child in schema.get("properties", {}).items()
+        }
+    if node_type == "array":
+        return [
+            make_payload(schema.get("items", {}), list_sizes, path, seed * 31 + index + 1, types)
+            for index in range(list_sizes.get(path, 1))
+        ]
+    value = (seed * 7919 + len(path)) % 10_000_000
+    if types.get(path) == "date":
+        return f"{value % 28 + 1:02d}/{value % 12 + 1:02d}/{2015 + value % 10}"
+    if types.get(path) == "category":
+        return f"{path.rsplit('.', 1)[-1].upper()} {value % 5}"
+    return f"{value // 100:,}".replace(",", ".") + f",{value % 100:02d}"
@@ -0,0 +1,75 @@
+"""
+Runs the pipeline against a FakeClient that answers 429 RESOURCE_EXHAUSTED when too
+many calls are in flight, to check that the adaptive limiter keeps the batch alive.
+
+Usage:
+    python -m benchmarks.throttling --files 12 --workers 8 --server-concurrency 3
+"""
+
+import argparse
+import os
+import time
+
+# Cached answers would hide the throttling
+os.environ["LOAN_READER_CACHE_DIR"] = ""
+
+from backend.connectors.gemini_connector import set_client  # noqa: E402
+from backend.lib import rate_limit  # noqa: E402
+from backend.lib.instrumentation import metrics_run  # noqa: E402
+from backend.lib.pipeline import process_documents  # noqa: E402
+from benchmarks.fake_client import FakeClient  # noqa: E402
+from benchmarks.synthetic import make_bnb_pdf  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--parts", type=int, default=3, help="Statements per file")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--server-concurrency", type=int, default=3,
+                        help="Calls the fake accepts at once before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Probability of a random 429 on any call")
+    parser.add_argument("--rpm", type=float, default=0, help="Client-side requests per minute")
+    parser.add_argument("--backoff-base", type=float, default=0.05)
+    args = parser.parse_args()
+
+    rate_limit.BACKOFF_BASE_S = args.backoff_base
+    limiter = rate_limit.RateLimiter(requests_per_minute=args.rpm, max_concurrency=args.workers)
+    rate_limit.set_limiter(limiter)
+    client = FakeClient(
+        latency=args.latency,
+        max_concurrent=args.server_concurrency,
+        error_rate=args.error_rate,
+    )
+    set_client(client)
+    # Distinct statements, or the pipeline would extract each identical one only once
+    documents = [
+        (f"BNB_{i}.pdf", make_bnb_pdf([2] * args.parts, 10, seed=i * args.parts))
+        for i in range(args.files)
+    ]
+
+    try:
+        with metrics_run("throttling") as run:
+            start = time.perf_counter()
+            results = process_documents(documents, max_workers=args.workers)
+            elapsed = time.perf_counter() - start
+    finally:
+        set_client(None)
+        rate_limit.set_limiter(None)
+
+    parts = [(name, part) for name, file_parts in results.items() for part in file_parts]
+    failed = [(name, part) for name, part in parts if part.get("Erro")]
+    retries = sum(row["retries"] for row in run.summary())
+    print(f"parts: {len(parts)} ({len(failed)} failed) in {elapsed:.2f}s")
+    print(f"calls: {client.calls}, answered 429: {client.throttled}, retries: {retries}")
+    print(f"peak calls in flight: {client.peak_in_flight} "
+          f"(server accepts {args.server_concurrency})")
+    print(f"limiter: {limiter.stats()}")
+    for name, part in failed[:5]:
+        print(f"  {name} (parte {part.get('Parte')}): {part['Erro']}")
+
+
+if __name__ == "__main__":
+    main()
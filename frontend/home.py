@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 
 st.markdown(
     "<h1 style='text-align: center;'>🏦 Loan statement reader</h1>", unsafe_allow_html=True
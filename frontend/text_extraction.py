@@ -1,124 +1,123 @@
-from collections import defaultdict
+import hashlib
 import streamlit as st
-import io
-from backend.prompts import PROMPTS
-from backend.schemas import SCHEMAS, LIST_KEYS
-from backend.lib.funcs import recursive_expand_rows, split_pdf_in_memory
-from backend.connectors.gemini_connector import generate_response
-import pandas as pd
-
-
-def classify_document(document):
+from backend.lib.export import EXPORT_FORMATS, export_results
+from backend.lib.flatten import get_flattener
+from backend.lib.instrumentation import combine_summaries, span
+from backend.lib.jobs import get_job_store
+
+# Seconds between job status refreshes while files are still being processed
+POLL_SECONDS = 2
+
+FILE_STATE_LABELS = {
+    "pending": "Na fila",
+    "running": "Processando...",
+    "failed": "Falhou",
+}
+
+
+def render_file(entry):
+    """Draws one file of a job with every part stored so far."""
+    st.subheader(f"Arquivo: {entry['name']}")
+    if entry["state"] in FILE_STATE_LABELS and (entry["state"] != "failed" or not entry["parts"]):
+        label = FILE_STATE_LABELS[entry["state"]]
+        if entry["state"] == "failed":
+            st.error(f"{label}: {entry['error']}")
+        else:
+            st.caption(label)
+    for part in entry["parts"]:
+        label = f"Fonte: {part['Fonte']}"
+        if "Parte" in part:
+            label += f" | Parte {part['Parte']}"
+        if "Erro" in part:
+            st.error(f"{label} | Falha: {part['Erro']}")
+            continue
+        st.caption(label)
+        with span("flatten", source=part["Fonte"]):
+            table = get_flattener(part["Fonte"]).to_frame([part["Conteúdo"]])
+        st.dataframe(table, hide_index=True)
+
+
+def file_hash(file):
+    return hashlib.sha256(file.getvalue()).hexdigest()
+
+
+def current_job(files):
     """
-    Classify a document into one of three categories using the AI model.
+    Job of the uploaded files: the one already created for them in this session,
+    or a new one. Files processed before (in any job) are not queued again.
     """
-    model = "gemini-2.0-flash-lite"
-    prediction = generate_response(
-        model, PROMPTS["classifier"], SCHEMAS["classifier"], document
-    )
-    return prediction
+    hashes = [file_hash(file) for file in files]
+    job = st.session_state.get("job")
+    if job is None or job["hashes"] != hashes:
+        job_id = get_job_store().create_job([(file.name, file.getvalue()) for file in files])
+        job = st.session_state["job"] = {"id": job_id, "hashes": hashes}
+    return job["id"]
 
 
-def extract_text(document, doc_source):
-    model = "gemini-2.0-flash-lite"
-    prediction = generate_response(
-        model, PROMPTS["extractor"], SCHEMAS[doc_source], document
-    )
-    return prediction
-
-
-# @st.cache_data(show_spinner=False)
-def classify_uploaded_files(files):
+def show_job(job_id, finished):
     """
-    Classify each uploaded file, split if necessary (for 'BNB'),
-    and extract text from the resulting document(s).
-    Returns results grouped by original file name.
+    Progress, status line and tables of a job. Reruns every POLL_SECONDS while the
+    job is running (see below); the whole page reruns once it finishes.
     """
+    status = get_job_store().job_status(job_id)
+    counts = status["counts"]
+    num_files = len(status["files"])
+    files_done = counts["done"] + counts["failed"]
+    if not status["finished"]:
+        st.progress(
+            files_done / num_files,
+            text=f"Processando arquivos... ({files_done} de {num_files})",
+        )
+    st.markdown(
+        f"**Concluídos:** {counts['done']} · **Em andamento:** {counts['running']}"
+        f" · **Na fila:** {counts['pending']} · **Falhas:** {counts['failed']}"
+    )
+    for entry in status["files"]:
+        render_file(entry)
+
+    summaries = [entry["metrics"] for entry in status["files"] if entry["metrics"]]
+    if summaries:
+        with st.expander("Métricas do processamento"):
+            st.dataframe(combine_summaries(summaries), hide_index=True)
 
-    my_bar = st.progress(0, text="Processando arquivos...")
-    num_files = len(files)
-    processed_results = defaultdict(list)
-    for id_file, file in enumerate(files):
-        with st.spinner(
-            f"Processando arquivo {id_file + 1} de {num_files}: {file.name}"
-        ):
-            # Classify the document
-            classification = classify_document(file.getvalue())
-            source = classification["Fonte_documento"]
-
-            if source == "BNB":
-                # Split the document into multiple sub-documents
-                sub_documents = split_pdf_in_memory(file.getvalue())
-
-                for id_subdoc, sub_doc in enumerate(sub_documents):
-                    # Extract text based on the classification
-                    extracted_text = extract_text(sub_doc.read(), source)
-
-                    processed_results[file.name].append(
-                        {
-                            "Fonte": source,
-                            "Conteúdo": extracted_text,
-                            "Parte": f"{id_subdoc + 1} de {len(sub_documents)}",
-                        }
-                    )
-            else:
-                # Extract text based on the classification
-                extracted_text = extract_text(file.getvalue(), source)
-
-                processed_results[file.name].append(
-                    {
-                        "Fonte": source,
-                        "Conteúdo": extracted_text,
-                    }
-                )
-
-            my_bar.progress(
-                (id_file + 1) / num_files,
-                text="Processando arquivos...",
-            )
-
-    my_bar.empty()  # Remove the progress bar after processing is complete
-    return processed_results
+    if status["finished"] and not finished:
+        st.rerun()  # Stop polling and show the download
 
 
 if "uploaded_files" in st.session_state:
-    results = classify_uploaded_files(st.session_state["uploaded_files"])
+    job_id = current_job(st.session_state["uploaded_files"])
+    # Lets the results be reopened (or a running batch followed) after closing the tab
+    st.query_params["job"] = job_id
 else:
-    results = None
+    job_id = st.query_params.get("job")
+
+store = get_job_store()
+status = store.job_status(job_id) if job_id else None
+if status is None:
     st.warning("Nenhum arquivo foi enviado.")
     st.markdown("[Voltar para a página inicial](./)")
-
-if results is not None:
-    st.write(results)
-    """# group the results by source
-    grouped_results = defaultdict(list)
-
-    for file_name, result in results.items():
-        st.subheader(f"Arquivo: {file_name}")
-        st.write(f"Fonte: {result['Fonte']}")
-
-        # Perform recursive expansion once per file
-        expanded_file = pd.DataFrame(
-            recursive_expand_rows(result["Conteúdo"], LIST_KEYS[result["Fonte"]])
+else:
+    if st.button(
+        "Reprocessar arquivos",
+        help="Descarta os resultados deste lote e processa todos os arquivos novamente.",
+    ):
+        store.reprocess(job_id)
+        status = store.job_status(job_id)
+
+    finished = status["finished"]
+    st.fragment(show_job, run_every=None if finished else POLL_SECONDS)(job_id, finished)
+
+    results = store.results(job_id) if finished else None
+    if results:
+        export_format = st.radio(
+            "Formato do arquivo", list(EXPORT_FORMATS), horizontal=True
         )
-        st.dataframe(expanded_file, hide_index=True)
-
-        # Group the extractions by source
-        source = result["Fonte"]
-        grouped_results[source].append(expanded_file)
-
-    # Create an Excel file with each source as a separate sheet
-    with io.BytesIO() as output:
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            for source, tables in grouped_results.items():
-                combined_table = pd.concat(tables, ignore_index=True)
-                combined_table.to_excel(writer, sheet_name=source, index=False)
-        output.seek(0)
-
-        # Provide the file for download
+        file_name, mime = EXPORT_FORMATS[export_format]
+        # The file is only built when the button is clicked, not on every rerun
         st.download_button(
             label="Baixar extrações agrupadas",
-            data=output,
-            file_name="extracted_data.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )"""
+            data=lambda: export_results(results, export_format),
+            file_name=file_name,
+            mime=mime,
+            on_click="ignore",
+        )
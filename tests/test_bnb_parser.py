@@ -0,0 +1,106 @@
+import copy
+
+import pytest
+
+from backend.lib.bnb_parser import (
+    BnbParseError,
+    parse_bnb_statement,
+    parse_statement_text,
+    validate_statement,
+)
+from benchmarks.synthetic import make_bnb_statement_pdf
+
+# Layout text of a one-page statement, as pypdf's layout mode prints it
+HEADER = [
+    "BANCO DO NORDESTE DO BRASIL S.A.                          Pág 1 de 1          15/01/2025 10:42:17",
+    "EXTRATO DE OPERAÇÃO DE CRÉDITO                            Agência: 0123 - FORTALEZA",
+    "Cliente: EOLICA EXEMPLO S.A.                              Endereço: RUA A, 10 - NATAL/RN",
+    "Período: 01/12/2024 a 31/12/2024                          Área de Crédito: INFRAESTRUTURA",
+    "Código da Operação: 191.101.324                           Valor da Operação: 1.000.000,00",
+    "Data do Contrato: 15/03/2019                              Vencimento Final: 15/03/2039",
+    "Programa: FNE PROINFRA",
+]
+TABLE = [
+    "Saldo Inicial                                        1.000,00           0,00",
+    "                                                     NORMAL             ATRASO",
+    "Data Lanç.  Data Valor.  D/C  Histórico       Valor     Saldo     Valor     Saldo",
+    "01/12/2024  01/12/2024    D   JUROS           10,00  1.010,00               0,00",
+    "05/12/2024  05/12/2024    C   AMORTIZACAO    110,00    900,00               0,00",
+    "Principal                                              900,00               0,00",
+]
+
+
+def statement(header=HEADER, table=TABLE):
+    return ["\n".join(header + table)]
+
+
+def test_parses_header_rows_and_balances():
+    result = parse_statement_text(statement())
+    validate_statement(result)
+    assert result["info_cliente"]["nome"] == "EOLICA EXEMPLO S.A."
+    assert result["dados_operacao"]["codigo_da_operacao"] == "191.101.324"
+    assert result["dados_operacao"]["programa"] == "FNE PROINFRA"
+    assert result["saldo_inicial"]["saldo_normal"] == "1.000,00"
+    assert [row["saldo_normal"] for row in result["transacoes"]] == ["1.010,00", "900,00"]
+    assert result["transacoes"][1]["d/c"] == "C"
+    assert result["transacoes"][0]["saldo_atraso"] == "0,00"
+
+
+def test_synthetic_statement_validates():
+    result = parse_bnb_statement(make_bnb_statement_pdf(3, seed=4))
+    assert result["dados_operacao"]["codigo_da_operacao"] == "191.101.328"
+    assert len(result["transacoes"]) == 90
+
+
+def test_rejects_unparseable_transaction_line():
+    table = TABLE[:3] + ["01/12/2024  01/12/2024    D   JUROS SEM VALOR"] + TABLE[3:]
+    with pytest.raises(BnbParseError):
+        parse_statement_text(statement(table=table))
+
+
+def test_rejects_inconsistent_balance():
+    table = list(TABLE)
+    table[4] = table[4].replace("900,00", "901,00", 1)
+    with pytest.raises(BnbParseError, match="Saldo normal"):
+        validate_statement(parse_statement_text(statement(table=table)))
+
+
+def test_rejects_final_balance_mismatch():
+    table = TABLE[:-1] + ["Principal                                              950,00               0,00"]
+    with pytest.raises(BnbParseError, match="Saldo final"):
+        validate_statement(parse_statement_text(statement(table=table)))
+
+
+@pytest.mark.parametrize(
+    "path, value",
+    [
+        (("info_cliente", "nome"), None),
+        (("info_cliente", "nome"), "EOLICA EXEMPLO S.A. Endereço: RUA A"),
+        (("dados_operacao", "programa"), "FNE Moeda: REAL"),
+        (("dados_operacao", "codigo_da_operacao"), "OPERACAO"),
+        (("dados_operacao", "data_do_contrato"), "15/03"),
+        (("dados_operacao", "valor_da_operacao"), "1.000.000"),
+        (("nome_banco",), None),
+    ],
+)
+def test_rejects_invalid_header_fields(path, value):
+    result = copy.deepcopy(parse_statement_text(statement()))
+    target = result
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+    with pytest.raises(BnbParseError):
+        validate_statement(result)
+
+
+def test_rejects_value_running_into_next_label():
+    # Single space before the next label: layout text merged the two fields
+    header = list(HEADER)
+    header[6] = "Programa: FNE PROINFRA Moeda: REAL"
+    with pytest.raises(BnbParseError, match="programa"):
+        validate_statement(parse_statement_text(statement(header=header)))
+
+
+def test_rejects_statement_without_transactions():
+    with pytest.raises(BnbParseError, match="Nenhum"):
+        validate_statement(parse_statement_text(statement(table=TABLE[:3])))
@@ -0,0 +1,17 @@
+import pyarrow.parquet as pq
+
+from backend.lib.export import write_parquet
+from backend.schemas import SCHEMAS
+from benchmarks.synthetic import make_payload
+
+
+def test_parquet_export_keeps_invalid_amounts_as_null(tmp_path):
+    record = make_payload(SCHEMAS["BNB"], {"transacoes": 2})
+    record["dados_operacao"]["valor_da_operacao"] = "7,171,595.78"
+    results = {"statement.pdf": [{"Fonte": "BNB", "Parte": 1, "Conteúdo": record}]}
+
+    (path,) = write_parquet(results, tmp_path)
+
+    table = pq.read_table(path)
+    assert table.num_rows == 2
+    assert table.column("dados_operacao.valor_da_operacao").null_count == 2
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from backend.lib.field_types import parse_amounts
+
+
+def test_parse_amounts_brazilian_format():
+    values = pd.Series(["1.234,5", "10,00-", "R$ 5", "3,1", None])
+    assert parse_amounts(values).tolist() == [123450, -1000, 500, 310, pd.NA]
+
+
+def test_parse_amounts_invalid_values_are_missing():
+    # More than two digits after a comma used to raise instead of becoming <NA>
+    values = pd.Series(["1,234", "7,171,595.78", "1,9000%", "abc"])
+    assert parse_amounts(values).isna().all()
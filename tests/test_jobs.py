@@ -0,0 +1,61 @@
+from backend.lib.jobs import JobStore
+
+PART = {"Fonte": "BNB", "Parte": 1, "Conteúdo": {"agencia": "001"}}
+
+
+def test_reprocess_runs_previously_processed_files_again(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.create_job([("a.pdf", b"%PDF-1")])
+    file_id, _, _, forced = store.claim("worker")
+    assert not forced
+    store.finish("worker", file_id, [PART])
+
+    # Same content in a new job: completed from the first job's parts
+    second = store.create_job([("a.pdf", b"%PDF-1")])
+    assert store.job_status(second)["finished"]
+    assert store.claim("worker") is None
+
+    store.reprocess(second)
+    claimed = store.claim("worker")
+    assert claimed is not None
+    assert claimed[3]  # Forced: the worker also bypasses the extraction cache
+    assert store.job_status(second)["counts"]["running"] == 1
+    assert store.job_status(first)["counts"]["done"] == 1
+
+
+def test_claim_batch_takes_files_of_one_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.create_job([("a.pdf", b"%PDF-a"), ("b.pdf", b"%PDF-b"), ("c.pdf", b"%PDF-a")])
+    store.create_job([("d.pdf", b"%PDF-d")])
+
+    # Identical files of the batch are claimed together, to be extracted once
+    claimed = store.claim_batch("worker", limit=10)
+    assert [name for _, name, _, _ in claimed] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert store.job_status(first)["counts"]["running"] == 3
+
+    assert [name for _, name, _, _ in store.claim_batch("worker", limit=10)] == ["d.pdf"]
+    assert store.claim_batch("worker") == []
+
+
+def test_claim_batch_is_bounded(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    store.create_job([(f"{i}.pdf", f"%PDF-{i}".encode()) for i in range(5)])
+    assert len(store.claim_batch("worker", limit=2)) == 2
+    assert len(store.claim_batch("other", limit=10)) == 3
+
+
+def test_reprocess_discards_writes_of_the_run_in_progress(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job = store.create_job([("a.pdf", b"%PDF-1")])
+    file_id, _, _, _ = store.claim("old")
+    assert store.save_part("old", file_id, 0, PART)
+
+    store.reprocess(job)
+    assert not store.save_part("old", file_id, 1, PART)
+    store.claim("new")
+    assert not store.finish("old", file_id, [PART, PART])
+
+    assert store.finish("new", file_id, [PART])
+    entry = store.job_status(job)["files"][0]
+    assert entry["state"] == "done"
+    assert len(entry["parts"]) == 1
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from backend.lib.json_stream import JsonEvent, JsonStreamParser, iter_json_events
+
+ANSWER = {
+    "nome_banco": "BANCO DO NORDESTE",
+    "page_info": {"current_page": "1", "total_pages": "2"},
+    "transacoes": [
+        {"historico": 'JUROS "NORMAIS" \\ PARCELA', "valor_normal": "1.234,56"},
+        {"historico": "AMORTIZAÇÃO\n2ª parcela", "valor_normal": "10,00-"},
+    ],
+    "saldos": [[{"data": "31/12/2024", "valor": "1,00"}], []],
+    "vazio": [],
+    "total": 12.5,
+    "ativo": True,
+    "banco_emissor": None,
+}
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+def test_result_matches_json_loads_for_any_chunking(size):
+    text = json.dumps(ANSWER, ensure_ascii=False, indent=1)
+    parser = JsonStreamParser()
+    for chunk in chunked(text, size):
+        parser.feed(chunk)
+    assert parser.close() == ANSWER
+
+
+def test_events_for_fields_and_array_items():
+    # Fragments split inside keys, strings, escapes and numbers
+    text = json.dumps(ANSWER)
+    events = list(iter_json_events(chunked(text, 5)))
+    items = [event for event in events if event.kind == "item"]
+    assert items[0] == JsonEvent("item", "transacoes", 0, ANSWER["transacoes"][0])
+    assert items[1] == JsonEvent("item", "transacoes", 1, ANSWER["transacoes"][1])
+    # Nested arrays are items of the top-level array, decoded whole
+    assert JsonEvent("item", "saldos", 0, ANSWER["saldos"][0]) in items
+    assert JsonEvent("item", "saldos", 1, []) in items
+    fields = {event.key: event.value for event in events if event.kind == "field"}
+    assert fields == ANSWER
+
+
+def test_item_is_emitted_before_the_response_ends():
+    text = json.dumps(ANSWER)
+    cut = text.index('"saldos"')
+    parser = JsonStreamParser()
+    events = parser.feed(text[:cut])
+    assert [event.index for event in events if event.kind == "item"] == [0, 1]
+
+
+def test_escaped_quotes_and_backslashes_split_across_chunks():
+    text = '{"a": "x\\\\", "b": "say \\"hi\\"", "c": ["\\u00e7", "}]"]}'
+    assert list(iter_json_events([text]))[-1].value == ["ç", "}]"]
+    for size in (1, 2, 3):
+        parser = JsonStreamParser()
+        for chunk in chunked(text, size):
+            parser.feed(chunk)
+        assert parser.close() == json.loads(text)
+
+
+def test_truncated_stream_raises():
+    text = json.dumps(ANSWER)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_events([text[:-10]]))
+
+
+def test_non_object_answer_is_parsed_whole():
+    parser = JsonStreamParser()
+    assert parser.feed('[1, 2') == []
+    parser.feed(", 3]")
+    assert parser.close() == [1, 2, 3]
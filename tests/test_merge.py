@@ -0,0 +1,72 @@
+from backend.lib.merge import merge_window_extractions
+from backend.schemas import LIST_KEYS
+
+
+def row(date, amount, description="PAGAMENTO"):
+    return {"data": date, "valor": amount, "historico": description}
+
+
+def test_rows_read_twice_at_the_overlap_are_kept_once():
+    first = {"agencia": "001", "transacoes": [row("01/01/2020", "10,00"), row("02/01/2020", "20,00")]}
+    second = {
+        "agencia": "001",
+        # The overlap page is read again, with different whitespace
+        "transacoes": [row("02/01/2020", "20,00", "PAGAMENTO  "), row("03/01/2020", "30,00")],
+    }
+
+    merged = merge_window_extractions([first, second], LIST_KEYS["BNB"])
+
+    assert [item["data"] for item in merged["transacoes"]] == ["01/01/2020", "02/01/2020", "03/01/2020"]
+
+
+def test_identical_rows_inside_one_window_are_kept():
+    repeated = row("02/01/2020", "20,00")
+    first = {"transacoes": [row("01/01/2020", "10,00"), repeated]}
+    # Overlap row, then the same payment again on the next page
+    second = {"transacoes": [repeated, repeated, row("03/01/2020", "30,00")]}
+
+    merged = merge_window_extractions([first, second], LIST_KEYS["BNB"])
+
+    assert merged["transacoes"] == [row("01/01/2020", "10,00"), repeated, repeated, row("03/01/2020", "30,00")]
+
+
+def test_rows_equal_to_earlier_rows_but_not_at_the_overlap_are_kept():
+    repeated = row("01/01/2020", "10,00")
+    # The overlap page has no rows; the second window starts with a new, equal payment
+    first = {"transacoes": [repeated, row("02/01/2020", "20,00")]}
+    second = {"transacoes": [repeated, row("03/01/2020", "30,00")]}
+
+    merged = merge_window_extractions([first, second], LIST_KEYS["BNB"])
+
+    assert len(merged["transacoes"]) == 4
+
+
+def test_header_fields_come_from_the_first_window():
+    first = {"agencia": "001", "cliente": "", "transacoes": [row("01/01/2020", "10,00")]}
+    second = {"agencia": "999", "cliente": "FULANO", "transacoes": [row("02/01/2020", "20,00")]}
+
+    merged = merge_window_extractions([None, first, second], LIST_KEYS["BNB"])
+
+    assert merged["agencia"] == "001"
+    # Empty in the first window: taken from the next one that has it
+    assert merged["cliente"] == "FULANO"
+    assert len(merged["transacoes"]) == 2
+
+
+def test_table_cut_by_a_window_edge_is_joined():
+    first = {"tabelas": [{"Contrato": "1", "Dados": [row("01/01/2020", "10,00"), row("02/01/2020", "20,00")]}]}
+    second = {
+        "tabelas": [
+            {"Contrato": "1", "Dados": [row("02/01/2020", "20,00"), row("03/01/2020", "30,00")]},
+            {"Contrato": "2", "Dados": [row("01/01/2020", "10,00")]},
+        ]
+    }
+
+    merged = merge_window_extractions([first, second], LIST_KEYS["FDNE"])
+
+    assert [table["Contrato"] for table in merged["tabelas"]] == ["1", "2"]
+    assert len(merged["tabelas"][0]["Dados"]) == 3
+
+
+def test_all_windows_empty():
+    assert merge_window_extractions([None, None], LIST_KEYS["BNB"]) is None
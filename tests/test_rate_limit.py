@@ -0,0 +1,20 @@
+from backend.lib.rate_limit import SharedTokenBucket, TokenBucket
+
+
+def test_shared_buckets_draw_from_one_budget(tmp_path):
+    # Two instances on one file stand for two processes
+    path = str(tmp_path / "rate_limit.sqlite3")
+    first = SharedTokenBucket(path, "requests", per_minute=60)
+    second = SharedTokenBucket(path, "requests", per_minute=60)
+
+    assert first.wait_time(60) == 0
+    assert second.wait_time(1) > 0.5
+
+    second.adjust(-30)  # Refund
+    assert first.wait_time(30) == 0
+
+
+def test_per_process_buckets_do_not_share(tmp_path):
+    first, second = TokenBucket(60), TokenBucket(60)
+    assert first.wait_time(60) == 0
+    assert second.wait_time(60) == 0
@@ -0,0 +1,48 @@
+import io
+
+import pypdf
+from pypdf import PdfWriter
+
+from backend.lib.funcs import iter_boundaries_jump, iter_boundaries_linear
+from benchmarks.synthetic import _add_text_page, _font, bnb_page_lines, make_bnb_pdf
+
+
+def pdf_with_numbering(numbering):
+    writer = PdfWriter()
+    font_ref = _font(writer)
+    for page, total in numbering:
+        _add_text_page(writer, font_ref, bnb_page_lines(page, total, rows=2))
+    output = io.BytesIO()
+    writer.write(output)
+    return pypdf.PdfReader(io.BytesIO(output.getvalue()))
+
+
+def boundaries(reader):
+    return list(iter_boundaries_jump(reader)), list(iter_boundaries_linear(reader))
+
+
+def test_jump_matches_linear_scan_on_consistent_numbering():
+    reader = pypdf.PdfReader(io.BytesIO(make_bnb_pdf([3, 1, 4, 2], rows_per_page=2)))
+
+    jump, linear = boundaries(reader)
+
+    assert jump == linear == [0, 3, 4, 8]
+
+
+def test_jump_falls_back_when_the_statement_end_does_not_match():
+    # The first statement says 4 pages but has 3: page 3 of the export is not '4 de 4'
+    reader = pdf_with_numbering([(1, 4), (2, 4), (3, 4), (1, 2), (2, 2)])
+
+    jump, linear = boundaries(reader)
+
+    assert jump == linear == [0, 3]
+
+
+def test_jump_skips_a_stray_first_page_inside_a_statement():
+    # Page 3 of a 4-page statement misprints 'Pág 1 de 2'; its first and last pages agree
+    reader = pdf_with_numbering([(1, 4), (2, 4), (1, 2), (4, 4), (1, 1)])
+
+    jump, linear = boundaries(reader)
+
+    assert jump == [0, 4]
+    assert linear == [0, 2, 4]